@@ -4,7 +4,20 @@ Password hashing and verification utilities for LDAP authentication.
 
 import bcrypt
 import base64
-from typing import Union, Optional
+import hashlib
+import hmac
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Union, Optional
+
+
+# Modular crypt format of a bcrypt hash: $2a$/$2b$/$2y$, cost, 53 chars of salt+digest
+_BCRYPT_RE = re.compile(rb'\$2[aby]\$\d{2}\$[./A-Za-z0-9]{53}')
 
 
 class PasswordManager:
@@ -15,8 +28,23 @@ class PasswordManager:
     - {BCRYPT} - bcrypt hashes (recommended)
     - {SSHA} - Salted SHA-1 (legacy support)
     - Plain text (for backwards compatibility, but not recommended)
+    
+    Successful bcrypt verifications are remembered for a short time so that
+    clients re-binding with the same credentials skip the bcrypt cost. Cache
+    keys are an HMAC of the stored hash and password under a per-process
+    random key, so plaintext passwords are never held in memory. Failed
+    verifications are never cached.
     """
     
+    # Verification cache settings (set enable_verify_cache = False to disable)
+    enable_verify_cache = True
+    verify_cache_ttl = 60.0
+    verify_cache_size = 1024
+    
+    _verify_cache: "OrderedDict[bytes, float]" = OrderedDict()
+    _verify_cache_lock = threading.Lock()
+    _verify_cache_pepper = secrets.token_bytes(32)
+    
     @staticmethod
     def hash_password(password: str, rounds: int = 12) -> str:
         """
@@ -43,6 +71,28 @@ class PasswordManager:
         b64_hash = base64.b64encode(hashed).decode('ascii')
         return f"{{BCRYPT}}{b64_hash}"
     
+    @staticmethod
+    def hash_passwords(passwords: List[str], rounds: int = 12) -> List[str]:
+        """
+        Hash several passwords in parallel.
+        
+        bcrypt releases the GIL while hashing, so a thread pool spreads the
+        work across all cores without the cost of worker processes.
+        
+        Args:
+            passwords: Plain text passwords to hash
+            rounds: Number of bcrypt rounds (default: 12)
+            
+        Returns:
+            LDAP-formatted bcrypt hashes, in the same order as ``passwords``
+        """
+        if len(passwords) <= 1:
+            return [PasswordManager.hash_password(p, rounds) for p in passwords]
+        
+        max_workers = min(len(passwords), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(PasswordManager.hash_password, passwords, [rounds] * len(passwords)))
+    
     @staticmethod
     def verify_password(password: str, stored_hash: str) -> bool:
         """
@@ -74,15 +124,64 @@ class PasswordManager:
     @staticmethod
     def _verify_bcrypt(password: str, stored_hash: str) -> bool:
         """Verify bcrypt hash."""
+        cache_key = None
+        if PasswordManager.enable_verify_cache:
+            cache_key = PasswordManager._verify_cache_key(password, stored_hash)
+            if PasswordManager._verify_cache_hit(cache_key):
+                return True
+        
         try:
             # Remove {BCRYPT} prefix and decode
             b64_hash = stored_hash[8:]  # Remove "{BCRYPT}"
             hash_bytes = base64.b64decode(b64_hash.encode('ascii'))
             
+            # Reject malformed hashes without a call into bcrypt
+            if not _BCRYPT_RE.fullmatch(hash_bytes):
+                return False
+            
             # Verify password
-            return bcrypt.checkpw(password.encode('utf-8'), hash_bytes)
+            verified = bcrypt.checkpw(password.encode('utf-8'), hash_bytes)
         except Exception:
             return False
+        
+        if verified and cache_key is not None:
+            PasswordManager._verify_cache_store(cache_key)
+        return verified
+    
+    @staticmethod
+    def _verify_cache_key(password: str, stored_hash: str) -> bytes:
+        """Derive the verification cache key for a password/hash pair."""
+        message = stored_hash.encode('utf-8') + b'\0' + password.encode('utf-8')
+        return hmac.new(PasswordManager._verify_cache_pepper, message, hashlib.sha256).digest()
+    
+    @staticmethod
+    def _verify_cache_hit(cache_key: bytes) -> bool:
+        """Check for an unexpired cached verification."""
+        with PasswordManager._verify_cache_lock:
+            expires_at = PasswordManager._verify_cache.get(cache_key)
+            if expires_at is None:
+                return False
+            if expires_at < time.monotonic():
+                del PasswordManager._verify_cache[cache_key]
+                return False
+            PasswordManager._verify_cache.move_to_end(cache_key)
+            return True
+    
+    @staticmethod
+    def _verify_cache_store(cache_key: bytes) -> None:
+        """Remember a successful verification, evicting the oldest if full."""
+        with PasswordManager._verify_cache_lock:
+            cache = PasswordManager._verify_cache
+            cache[cache_key] = time.monotonic() + PasswordManager.verify_cache_ttl
+            cache.move_to_end(cache_key)
+            while len(cache) > PasswordManager.verify_cache_size:
+                cache.popitem(last=False)
+    
+    @staticmethod
+    def clear_verify_cache() -> None:
+        """Forget all cached verifications."""
+        with PasswordManager._verify_cache_lock:
+            PasswordManager._verify_cache.clear()
     
     @staticmethod
     def _verify_ssha(password: str, stored_hash: str) -> bool:
@@ -90,8 +189,6 @@ class PasswordManager:
         Verify SSHA (Salted SHA-1) hash for legacy compatibility.
         Note: SHA-1 is deprecated, this is for legacy support only.
         """
-        import hashlib
-        
         try:
             # Remove {SSHA} prefix and decode
             b64_hash = stored_hash[6:]  # Remove "{SSHA}"
@@ -123,6 +220,7 @@ class PasswordManager:
             Updated dictionary with hashed passwords
         """
         updated_entries = []
+        plain_passwords = []
         
         for entry in entries_dict:
             # Create a copy to avoid modifying original
@@ -131,24 +229,24 @@ class PasswordManager:
             
             # Check for userPassword attribute
             if "userPassword" in attributes:
-                passwords = attributes["userPassword"]
-                hashed_passwords = []
+                passwords = list(attributes["userPassword"])
                 
-                for password in passwords:
+                for i, password in enumerate(passwords):
                     # Only hash if it's plain text (no format prefix)
                     if not password.startswith("{"):
-                        hashed_password = PasswordManager.hash_password(password)
-                        hashed_passwords.append(hashed_password)
-                        print(f"🔒 Upgraded password for {updated_entry.get('dn', 'unknown')}")
-                    else:
-                        # Keep existing hashed passwords
-                        hashed_passwords.append(password)
+                        plain_passwords.append((updated_entry, passwords, i))
                 
-                attributes["userPassword"] = hashed_passwords
+                attributes["userPassword"] = passwords
                 updated_entry["attributes"] = attributes
             
             updated_entries.append(updated_entry)
         
+        # Hash all plain text passwords in one parallel batch
+        hashed = PasswordManager.hash_passwords([passwords[i] for _, passwords, i in plain_passwords])
+        for (updated_entry, passwords, i), hashed_password in zip(plain_passwords, hashed):
+            passwords[i] = hashed_password
+            print(f"🔒 Upgraded password for {updated_entry.get('dn', 'unknown')}")
+        
         return updated_entries
 
 
@@ -156,20 +254,30 @@ def generate_secure_password(length: int = 16) -> str:
     """
     Generate a cryptographically secure random password.
     
+    The result always contains at least one lowercase letter, one uppercase
+    letter and one digit.
+    
     Args:
         length: Password length (minimum 12)
         
     Returns:
         Secure random password string
     """
-    import secrets
     import string
     
     if length < 12:
         raise ValueError("Password length must be at least 12 characters")
     
     alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
-    return ''.join(secrets.choice(alphabet) for _ in range(length))
+    rng = secrets.SystemRandom()
+    chars = rng.choices(alphabet, k=length)
+    
+    # Guarantee each required character class at distinct random positions
+    required = (string.ascii_lowercase, string.ascii_uppercase, string.digits)
+    for position, charset in zip(rng.sample(range(length), len(required)), required):
+        chars[position] = rng.choice(charset)
+    
+    return ''.join(chars)
 
 
 # Convenience functions
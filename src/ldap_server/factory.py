@@ -55,6 +55,9 @@ class CustomLDAPServer(LDAPServer):
             request: LDAPBindRequest object
             controls: LDAP controls
             reply: Reply function
+            
+        Returns:
+            Deferred that fires once the bind response has been sent
         """
         if self.debug:
             log.msg(f"Bind request received: DN={request.dn}, auth={request.auth}")
@@ -77,33 +80,45 @@ class CustomLDAPServer(LDAPServer):
             dn_str = request.dn.decode('utf-8') if isinstance(request.dn, bytes) else str(request.dn)
             password = request.auth.decode('utf-8') if isinstance(request.auth, bytes) else str(request.auth)
             
-            # Handle simple bind
-            result_code, message = self.bind_handler.handle_simple_bind(dn_str, password)
-            
-            if result_code == 0:
-                self.authenticated_dn = dn_str if dn_str else None  # None for anonymous
-                if self.debug:
-                    log.msg(f"Authentication successful for: {dn_str or 'anonymous'}")
-            else:
-                self.authenticated_dn = None
-                if self.debug:
-                    log.msg(f"Authentication failed for: {dn_str} - {message}")
-            
-            response = LDAPBindResponse(resultCode=result_code,
-                                      matchedDN='',
-                                      errorMessage=message)
-            reply(response)
-                
+            # Handle simple bind; password verification runs off the reactor thread
+            d = self.bind_handler.handle_simple_bind_deferred(dn_str, password)
         except Exception as e:
             # Handle any unexpected errors
+            self._bind_error(e, reply)
+            return
+        
+        d.addCallback(self._bind_result, dn_str, reply)
+        d.addErrback(self._bind_error, reply)
+        return d
+    
+    def _bind_result(self, result, dn_str, reply):
+        """Record the outcome of a simple bind and send the response."""
+        result_code, message = result
+        
+        if result_code == 0:
+            self.authenticated_dn = dn_str if dn_str else None  # None for anonymous
+            if self.debug:
+                log.msg(f"Authentication successful for: {dn_str or 'anonymous'}")
+        else:
             self.authenticated_dn = None
             if self.debug:
-                log.msg(f"Error handling bind request: {e}")
-            
-            response = LDAPBindResponse(resultCode=ldaperrors.LDAPOperationsError.resultCode,
-                                      matchedDN='',
-                                      errorMessage='Internal server error')
-            reply(response)
+                log.msg(f"Authentication failed for: {dn_str} - {message}")
+        
+        response = LDAPBindResponse(resultCode=result_code,
+                                  matchedDN='',
+                                  errorMessage=message)
+        reply(response)
+    
+    def _bind_error(self, error, reply):
+        """Reply with an operations error after an unexpected bind failure."""
+        self.authenticated_dn = None
+        if self.debug:
+            log.msg(f"Error handling bind request: {error}")
+        
+        response = LDAPBindResponse(resultCode=ldaperrors.LDAPOperationsError.resultCode,
+                                  matchedDN='',
+                                  errorMessage='Internal server error')
+        reply(response)
 
 
 class LDAPServerFactory(ServerFactory):
@@ -2,6 +2,7 @@
 LDAP bind authentication handlers.
 """
 
+from twisted.internet import defer, threads
 from twisted.python import log
 from ldaptor.protocols.ldap import ldaperrors
 from ldaptor.protocols.ldap.distinguishedname import DistinguishedName
@@ -39,6 +40,50 @@ class BindHandler:
         Returns:
             tuple: (result_code: int, message: str)
         """
+        result, user_entry, normalized_dn = self._prepare_simple_bind(dn_str, password)
+        if result is not None:
+            return result
+        
+        verified = self._verify_user_password(user_entry, password)
+        return self._password_result(normalized_dn, verified)
+    
+    def handle_simple_bind_deferred(self, dn_str, password):
+        """
+        Handle simple bind authentication without blocking the reactor.
+        
+        DN parsing and the entry lookup run in the calling thread; the
+        password check (bcrypt is tens to hundreds of milliseconds of CPU
+        that releases the GIL) runs in the reactor's thread pool so
+        concurrent binds proceed in parallel.
+        
+        Args:
+            dn_str: Distinguished name as string
+            password: Plain text password
+            
+        Returns:
+            Deferred firing with (result_code: int, message: str)
+        """
+        result, user_entry, normalized_dn = self._prepare_simple_bind(dn_str, password)
+        if result is not None:
+            return defer.succeed(result)
+        
+        d = threads.deferToThread(self._verify_user_password, user_entry, password)
+        d.addCallback(lambda verified: self._password_result(normalized_dn, verified))
+        return d
+    
+    def _prepare_simple_bind(self, dn_str, password):
+        """
+        Run the simple bind checks that precede password verification.
+        
+        Args:
+            dn_str: Distinguished name as string
+            password: Plain text password
+            
+        Returns:
+            tuple: (result, user_entry, normalized_dn) where result is a
+            final (result_code, message) tuple, or None if the password
+            still has to be verified against user_entry
+        """
         if self.debug:
             log.msg(f"Simple bind attempt for DN: {dn_str}")
         
@@ -46,13 +91,13 @@ class BindHandler:
         if not dn_str and not password:
             if self.debug:
                 log.msg("Anonymous bind successful")
-            return 0, "Anonymous bind successful"
+            return (0, "Anonymous bind successful"), None, None
         
         # Reject empty password with non-empty DN (RFC 4513)
         if dn_str and not password:
             if self.debug:
                 log.msg(f"Rejecting bind with empty password for DN: {dn_str}")
-            return 49, "Invalid credentials"  # invalidCredentials
+            return (49, "Invalid credentials"), None, None  # invalidCredentials
         
         # Parse and normalize DN
         try:
@@ -61,17 +106,20 @@ class BindHandler:
         except Exception as e:
             if self.debug:
                 log.msg(f"Invalid DN format: {dn_str} - {e}")
-            return 34, "Invalid DN syntax"  # invalidDNSyntax
+            return (34, "Invalid DN syntax"), None, None  # invalidDNSyntax
         
         # Find user entry in storage
         user_entry = self._find_user_entry(normalized_dn)
         if not user_entry:
             if self.debug:
                 log.msg(f"User not found: {normalized_dn}")
-            return 32, "No such object"  # noSuchObject
+            return (32, "No such object"), None, None  # noSuchObject
         
-        # Verify password
-        if self._verify_user_password(user_entry, password):
+        return None, user_entry, normalized_dn
+    
+    def _password_result(self, normalized_dn, verified):
+        """Map a password verification outcome to a bind result."""
+        if verified:
             if self.debug:
                 log.msg(f"Bind successful for: {normalized_dn}")
             return 0, "Authentication successful"
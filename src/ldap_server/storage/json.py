@@ -9,22 +9,126 @@ import logging
 import tempfile
 import os
 import shutil
+import sys
 import time
 import weakref
 import fcntl
+import copy
 import errno
+import functools
 from pathlib import Path
 from typing import Dict, List, Any, Union, Optional, Set, Tuple, Iterator
 from collections import OrderedDict
 from twisted.internet import defer
+from ldaptor import ldiftree
+from ldaptor.entry import BaseLDAPEntry
 from ldaptor.ldiftree import LDIFTreeEntry
 from ldaptor.protocols.ldap import distinguishedname
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 
 from ldap_server.auth.password import PasswordManager
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# File extensions stored as newline-delimited JSON (one entry per line)
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+
+# Files at least this large have their page cache dropped after parsing;
+# smaller files are cheap to keep and often read again soon
+PAGE_CACHE_DROP_MIN_BYTES = 16 * 1024 * 1024
+
+
+# Parse with orjson when installed (pip install py-ldap-server[fast]); its
+# JSONDecodeError subclasses json.JSONDecodeError, so callers see the same errors
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 encoded JSON, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _is_ndjson(path: Path) -> bool:
+    """Check whether a file uses the newline-delimited JSON format."""
+    return path.suffix.lower() in NDJSON_SUFFIXES
+
+
+@functools.lru_cache(maxsize=16384)
+def _parse_dn(dn: str) -> distinguishedname.DistinguishedName:
+    """
+    Parse a DN string, memoized across tree rebuilds.
+    
+    Reloads rebuild the whole tree from the same DNs, and ldaptor's DN
+    parser is pure Python, so repeated parses are served from the cache.
+    The cache is bounded and shared by every storage instance in the
+    process, so cleaning up one instance leaves it alone.
+    """
+    return distinguishedname.DistinguishedName(stringValue=dn)
+
+
+def _ends_with_newline(path: Path) -> bool:
+    """Check whether a file is empty or ends with a newline."""
+    with open(path, 'rb') as f:
+        if f.seek(0, os.SEEK_END) == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+
+def _drop_page_cache(fd: int) -> None:
+    """
+    Tell the kernel a fully read file's cached pages are no longer needed.
+    
+    Unchanged files are served from the parse cache on reload, so the
+    pages of a large file would otherwise only compete with useful page
+    cache.
+    """
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except (AttributeError, OSError):
+        # posix_fadvise is unavailable on some platforms (e.g. macOS)
+        pass
+
+
+def _stat_key(stat: os.stat_result) -> Tuple[int, int, int]:
+    """Identify a file version by modification time, size and inode."""
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def _normalize_dn(dn: str) -> str:
+    """
+    Normalize a DN for case- and spacing-insensitive lookups.
+    
+    The DN is split by the (memoized) DN parser, so escaped commas stay
+    inside their RDN, spacing around '=' and ',' is ignored and the parts
+    of a multi-valued RDN compare in any order. DNs the parser rejects are
+    only lowercased and stripped.
+    """
+    try:
+        rdns = _parse_dn(dn).split()
+    except Exception:
+        # ldaptor raises more than InvalidRelativeDistinguishedName for bad
+        # input (e.g. IndexError for a trailing backslash)
+        return dn.strip().lower()
+    return ','.join(
+        '+'.join(sorted(
+            f"{ava.attributeType.strip().lower()}={distinguishedname.escape(ava.value.strip().lower())}"
+            for ava in rdn.split()
+        ))
+        for rdn in rdns
+    )
+
 
 class AtomicJSONWriter:
     """
@@ -34,7 +138,14 @@ class AtomicJSONWriter:
     and provides concurrent access protection through file locking.
     """
     
-    def __init__(self, target_path: Path, backup_enabled: bool = True, lock_timeout: float = 10.0):
+    # Per-target locks so threads of this process wait on each other directly
+    # instead of polling flock; flock then only arbitrates between processes.
+    # Weak values: a path's lock goes away once no writer holds or awaits it.
+    _thread_locks: 'weakref.WeakValueDictionary[str, threading.Lock]' = weakref.WeakValueDictionary()
+    _thread_locks_guard = threading.Lock()
+    
+    def __init__(self, target_path: Path, backup_enabled: bool = True, lock_timeout: float = 10.0,
+                 fsync: bool = True, durable: bool = True, pretty_print: bool = True):
         """
         Initialize atomic JSON writer.
         
@@ -42,12 +153,26 @@ class AtomicJSONWriter:
             target_path: Path to the target JSON file
             backup_enabled: Whether to create backups before writing
             lock_timeout: Maximum time to wait for file lock (seconds)
+            fsync: Flush written data to disk before the rename. Disabling this
+                keeps writes atomic but not durable across a power loss.
+            durable: Also fsync the parent directory after the rename so the
+                rename itself survives a crash (only applies when fsync is set)
+            pretty_print: Indent JSON array files for human editing. Compact
+                output is smaller and faster to encode. NDJSON files are
+                always written one compact entry per line.
         """
         self.target_path = Path(target_path)
         self.backup_enabled = backup_enabled
         self.lock_timeout = lock_timeout
+        self.fsync = fsync
+        self.durable = durable
+        self.pretty_print = pretty_print
         self._lock_file = None
+        self._thread_lock = None
         self._temp_file = None
+        self.committed_stat = None  # os.stat_result of the file as committed
+        self._unchanged = False  # New contents identical to the existing file
+        self._appended = False  # Entries were appended to the target in place
         
         # Ensure target directory exists
         self.target_path.parent.mkdir(parents=True, exist_ok=True)
@@ -56,11 +181,6 @@ class AtomicJSONWriter:
         """Context manager entry - acquire lock and prepare for writing."""
         try:
             self._acquire_lock()
-            
-            # Create backup if enabled and file exists
-            if self.backup_enabled and self.target_path.exists():
-                self._backup_path = self._create_backup()
-                
             self._prepare_temp_file()
             return self
         except Exception:
@@ -82,10 +202,16 @@ class AtomicJSONWriter:
         lock_path = self.target_path.with_suffix(self.target_path.suffix + '.lock')
         
         try:
+            # Queue behind other threads of this process first
+            start_time = time.time()
+            thread_lock = self._thread_lock_for(self.target_path)
+            if not thread_lock.acquire(timeout=self.lock_timeout):
+                raise TimeoutError(f"Could not acquire lock on {self.target_path} within {self.lock_timeout}s")
+            self._thread_lock = thread_lock
+            
             self._lock_file = open(lock_path, 'w')
             
             # Try to acquire exclusive lock with timeout
-            start_time = time.time()
             while True:
                 try:
                     fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
@@ -110,8 +236,25 @@ class AtomicJSONWriter:
                 except:
                     pass
                 self._lock_file = None
+            self._release_thread_lock()
             raise RuntimeError(f"Failed to acquire file lock: {e}")
     
+    @classmethod
+    def _thread_lock_for(cls, target_path: Path) -> threading.Lock:
+        """Get the in-process lock for a target file."""
+        key = os.path.abspath(target_path)
+        with cls._thread_locks_guard:
+            lock = cls._thread_locks.get(key)
+            if lock is None:
+                lock = cls._thread_locks[key] = threading.Lock()
+            return lock
+    
+    def _release_thread_lock(self):
+        """Release the in-process lock if held."""
+        if self._thread_lock is not None:
+            self._thread_lock.release()
+            self._thread_lock = None
+    
     def _create_backup(self) -> Path:
         """Create timestamped backup of existing file."""
         timestamp = int(time.time())
@@ -123,7 +266,7 @@ class AtomicJSONWriter:
         """Prepare temporary file for atomic write."""
         temp_dir = self.target_path.parent
         self._temp_file = tempfile.NamedTemporaryFile(
-            mode='w',
+            mode='wb',
             dir=temp_dir,
             prefix=f".{self.target_path.name}.",
             suffix='.tmp',
@@ -132,11 +275,39 @@ class AtomicJSONWriter:
     
     def _commit_write(self):
         """Commit the write by atomically renaming temp file."""
+        if self._unchanged or self._appended:
+            # Target already holds the final contents: drop the temp file and skip the backup
+            self._rollback_write()
+            if self.committed_stat is None:
+                self.committed_stat = os.stat(self.target_path)
+            return
+        
         if self._temp_file:
+            # Create backup if enabled and file exists (still under the lock)
+            if self.backup_enabled and self.target_path.exists():
+                self._backup_path = self._create_backup()
+            
+            # The rename keeps inode, size and mtime, so this describes the target
+            self.committed_stat = os.fstat(self._temp_file.fileno())
             self._temp_file.close()
             # Atomic rename
-            os.rename(self._temp_file.name, self.target_path)
+            os.replace(self._temp_file.name, self.target_path)
             self._temp_file = None
+            
+            if self.fsync and self.durable:
+                self._fsync_directory()
+    
+    def _fsync_directory(self):
+        """Persist the rename by syncing the parent directory."""
+        fd = os.open(self.target_path.parent, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        except OSError as e:
+            # Some filesystems (e.g. network mounts) cannot sync directories
+            if e.errno not in (errno.ENOTSUP, errno.EINVAL):
+                raise
+        finally:
+            os.close(fd)
     
     def _rollback_write(self):
         """Rollback failed write by removing temp file."""
@@ -156,11 +327,54 @@ class AtomicJSONWriter:
                 self._lock_file.close()
                 # Remove lock file
                 lock_path = self.target_path.with_suffix(self.target_path.suffix + '.lock')
-                if lock_path.exists():
-                    lock_path.unlink()
+                lock_path.unlink(missing_ok=True)
             except:
                 pass
             self._lock_file = None
+        self._release_thread_lock()
+    
+    def _matches_target(self, payload: bytes) -> bool:
+        """Check whether the target file already contains exactly this payload."""
+        try:
+            if self.target_path.stat().st_size != len(payload):
+                return False
+            return self.target_path.read_bytes() == payload
+        except FileNotFoundError:
+            return False
+    
+    def append_json(self, data: List[Dict[str, Any]]) -> None:
+        """
+        Append entries to a newline-delimited JSON file in place.
+        
+        Existing content is not rewritten. A crash mid-append can at worst
+        leave a torn final line, which the loader skips; such a file must be
+        rewritten with write_json before it can be appended to again.
+        
+        Args:
+            data: List of entries to append
+            
+        Raises:
+            RuntimeError: If the target is not an NDJSON file ending in a
+                newline, or the append fails
+        """
+        if not self._lock_file:
+            raise RuntimeError("AtomicJSONWriter not properly initialized")
+        if not _is_ndjson(self.target_path):
+            raise RuntimeError(f"Cannot append to non-NDJSON file: {self.target_path}")
+        if not _ends_with_newline(self.target_path):
+            raise RuntimeError(f"Cannot append to {self.target_path}: last line is not terminated")
+        
+        try:
+            payload = b''.join(_json_dumps(entry) + b'\n' for entry in data)
+            with open(self.target_path, 'ab') as f:
+                f.write(payload)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+                self.committed_stat = os.fstat(f.fileno())
+            self._appended = True
+        except Exception as e:
+            raise RuntimeError(f"Failed to append JSON data: {e}")
     
     def write_json(self, data: List[Dict[str, Any]]) -> None:
         """
@@ -176,57 +390,153 @@ class AtomicJSONWriter:
             raise RuntimeError("AtomicJSONWriter not properly initialized")
         
         try:
-            json.dump(data, self._temp_file, indent=2, ensure_ascii=False)
+            if _is_ndjson(self.target_path):
+                payload = b''.join(_json_dumps(entry) + b'\n' for entry in data)
+            else:
+                payload = _json_dumps(data, indent=self.pretty_print)
+            
+            # Skip the write, fsync, rename and backup if the file already holds this payload
+            if self._matches_target(payload):
+                self._unchanged = True
+                return
+            
+            self._temp_file.write(payload)
             self._temp_file.flush()
-            os.fsync(self._temp_file.fileno())
+            if self.fsync:
+                os.fsync(self._temp_file.fileno())
         except Exception as e:
             raise RuntimeError(f"Failed to write JSON data: {e}")
 
 
 class JSONFileWatcher(FileSystemEventHandler):
-    """File system watcher for JSON file changes."""
+    """
+    File system watcher for JSON file changes.
+    
+    Reloads are debounced on the trailing edge: each relevant event restarts
+    a timer of storage.debounce_time seconds, and the reload runs once the
+    burst of events has settled, so it always sees the final file contents.
+    """
     
     def __init__(self, storage: 'JSONStorage'):
         """Initialize watcher with reference to storage."""
         super().__init__()
         self.storage_ref = weakref.ref(storage)
-        self.last_reload = 0
-        self.debounce_time = 0.5
+        self.debounce_time = storage.debounce_time
+        self._timer = None
+        self._timer_lock = threading.Lock()
+        # Absolute paths of watched files, so events are matched without stat calls
+        self.watched_paths = {os.path.abspath(json_file) for json_file in storage.json_files}
     
     def on_modified(self, event):
         """Handle file modification events."""
-        if event.is_directory:
+        if not event.is_directory:
+            self._handle_change(event.src_path)
+    
+    def on_created(self, event):
+        """Handle file creation events (e.g. a file recreated by an editor)."""
+        if not event.is_directory:
+            self._handle_change(event.src_path)
+    
+    def on_moved(self, event):
+        """Handle rename events, which is how atomic writers publish a file."""
+        if not event.is_directory:
+            self._handle_change(event.dest_path)
+    
+    def _handle_change(self, path: str):
+        """Schedule a reload if a watched JSON file changed."""
+        changed_path = Path(path)
+        
+        # Skip temporary files (like atomic write temp files)
+        if changed_path.name.endswith('.tmp') or '.tmp.' in changed_path.name:
             return
-            
+        
+        # Check if this is one of our watched JSON files
+        if os.path.abspath(path) in self.watched_paths:
+            self._schedule_reload(changed_path)
+    
+    def _schedule_reload(self, changed_path: Path):
+        """(Re)start the debounce timer for a reload."""
+        with self._timer_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce_time, self._reload, args=(changed_path,))
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def _reload(self, changed_path: Path):
+        """Reload storage after the debounce period has passed."""
+        with self._timer_lock:
+            self._timer = None
+        
         storage = self.storage_ref()
         if storage is None:
             return
-            
-        # Check if any of our watched files was modified
-        modified_path = Path(event.src_path)
         
-        # Skip temporary files (like atomic write temp files)
-        if modified_path.name.endswith('.tmp') or '.tmp.' in modified_path.name:
-            return
-            
         try:
-            # Check if this is one of our watched JSON files
-            is_watched_file = any(modified_path.samefile(json_file) for json_file in storage.json_files)
-        except (OSError, FileNotFoundError):
-            # File may have been deleted (e.g., temporary atomic write files)
-            return
+            with storage._lock:
+                if storage._closed:
+                    return
+                if not storage._files_changed_on_disk():
+                    logging.debug(f"Skipping reload, no unseen changes: {changed_path}")
+                    return
+                logging.info(f"Reloading JSON data due to file change: {changed_path}")
+                storage._load_all_files()
+            logging.info("Hot reload completed successfully")
+        except Exception as e:
+            logging.error(f"Failed to reload JSON data: {e}")
+    
+    def cancel(self):
+        """Cancel any pending reload."""
+        with self._timer_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+
+def _merge_entries(
+    entries_per_file: List[List[Dict[str, Any]]], strategy: str,
+    dn_keys_per_file: Optional[List[List[str]]] = None
+) -> Tuple[Dict[str, Dict[str, Any]], int]:
+    """
+    Merge entry lists from multiple files according to a merge strategy.
+    
+    Args:
+        entries_per_file: Entry lists in file order
+        strategy: How to handle DN conflicts ("last_wins", "first_wins", "error")
+        dn_keys_per_file: Normalized DN of each entry, per file, if already known
+        
+    Returns:
+        Tuple of (normalized DN to entry mapping, number of conflicting DNs)
+        
+    Raises:
+        ValueError: If a DN conflicts under the "error" strategy or the strategy is unknown
+    """
+    dn_to_entry = {}
+    conflicting_dns = set()
+    
+    if dn_keys_per_file is None:
+        dn_keys_per_file = [[_normalize_dn(entry['dn']) for entry in entries] for entries in entries_per_file]
+    
+    for entries, dn_keys in zip(entries_per_file, dn_keys_per_file):
+        for entry, dn in zip(entries, dn_keys):
+            if dn not in dn_to_entry:
+                dn_to_entry[dn] = entry
+                continue
             
-        if is_watched_file:
-            # Debounce rapid changes
-            current_time = time.time()
-            if current_time - self.last_reload > self.debounce_time:
-                self.last_reload = current_time
-                try:
-                    logging.info(f"Reloading JSON data due to file change: {modified_path}")
-                    storage._load_all_files()
-                    logging.info("Hot reload completed successfully")
-                except Exception as e:
-                    logging.error(f"Failed to reload JSON data: {e}")
+            conflicting_dns.add(dn)
+            
+            if strategy == "first_wins":
+                # Keep first occurrence
+                continue
+            elif strategy == "last_wins":
+                # Use latest occurrence
+                dn_to_entry[dn] = entry
+            elif strategy == "error":
+                raise ValueError(f"Duplicate DN found with error merge strategy: {dn}")
+            else:
+                raise ValueError(f"Unknown merge strategy: {strategy}")
+    
+    return dn_to_entry, len(conflicting_dns)
 
 
 class JSONStorage:
@@ -246,7 +556,7 @@ class JSONStorage:
     
     def __init__(
         self,
-        json_file_paths: Union[str, List[str], Path, List[Path]],
+        json_file_paths: Union[str, os.PathLike, List[Union[str, os.PathLike]]],
         read_only: bool = False,
         merge_strategy: str = "last_wins",
         hash_plain_passwords: bool = True,
@@ -256,7 +566,9 @@ class JSONStorage:
         lazy_cache_max_entries: int = 1000,
         lazy_cache_max_memory_mb: int = 100,
         atomic_write_timeout: float = 10.0,
-        enable_backups: bool = True
+        enable_backups: bool = True,
+        fsync_writes: bool = True,
+        pretty_print_writes: bool = True
     ):
         """
         Initialize unified JSON storage backend.
@@ -267,15 +579,19 @@ class JSONStorage:
             merge_strategy: How to handle DN conflicts in multi-file mode ("last_wins", "first_wins", "error")
             hash_plain_passwords: Automatically hash plain text passwords
             enable_file_watching: Monitor files for changes and hot reload
-            debounce_time: Minimum time between file change reloads (seconds)
-            enable_lazy_loading: Enable lazy loading for large files
+            debounce_time: Quiet period after the last file change before reloading (seconds)
+            enable_lazy_loading: Defer building the LDAP tree until get_root() is first called
             lazy_cache_max_entries: Maximum entries in lazy loading cache
             lazy_cache_max_memory_mb: Maximum memory for lazy loading cache (MB)
             atomic_write_timeout: Timeout for acquiring file locks during writes (seconds)
             enable_backups: Create backups before write operations
+            fsync_writes: fsync each write before it replaces the file (disable for
+                throughput when durability across power loss is not needed)
+            pretty_print_writes: Indent rewritten JSON array files (disable for
+                faster writes to files that are not edited by hand)
         """
         # Normalize file paths
-        if isinstance(json_file_paths, (str, Path)):
+        if isinstance(json_file_paths, (str, os.PathLike)):
             self.json_files = [Path(json_file_paths)]
         else:
             self.json_files = [Path(f) for f in json_file_paths]
@@ -291,14 +607,23 @@ class JSONStorage:
         self.lazy_cache_max_memory_mb = lazy_cache_max_memory_mb
         self.atomic_write_timeout = atomic_write_timeout
         self.enable_backups = enable_backups
+        self.fsync_writes = fsync_writes
+        self.pretty_print_writes = pretty_print_writes
         
         # Internal state
         self._temp_dir = tempfile.mkdtemp(prefix="ldap_json_unified_")
+        self._tree_path = os.path.join(self._temp_dir, "tree")  # Symlink to the current tree build
         self._root_entry = None
         self._file_watcher = None
         self._observer = None
         self._entries_by_file = {}  # Track which entries came from which file
+        self._dn_index = {}  # file -> {normalized DN: position in that file's entries}
+        self._dn_key_cache = {}  # file -> (entry list, normalized DN per entry, DN index)
         self._all_entries = []
+        self._merge_conflicts = 0
+        self._parse_cache = {}  # path -> (stat key, parsed entries)
+        self._lock = threading.RLock()  # Serializes loads and writes across threads
+        self._closed = False  # Set by cleanup(); pending reloads then bail out
         
         # Load initial data
         self._load_all_files()
@@ -310,69 +635,208 @@ class JSONStorage:
         logging.info(f"JSON Storage initialized: {len(self.json_files)} files, "
                     f"read_only={self.read_only}, merge_strategy={self.merge_strategy}")
     
+    def _atomic_writer(self, file_path: Path) -> AtomicJSONWriter:
+        """Create an AtomicJSONWriter configured for this storage."""
+        return AtomicJSONWriter(
+            target_path=file_path,
+            backup_enabled=self.enable_backups,
+            lock_timeout=self.atomic_write_timeout,
+            fsync=self.fsync_writes,
+            pretty_print=self.pretty_print_writes
+        )
+    
     def _load_all_files(self):
-        """Load and merge data from all JSON files."""
-        all_entries = []
-        self._entries_by_file = {}
-        load_errors = []
+        """
+        Load and merge data from all JSON files.
         
-        for json_file in self.json_files:
-            if not json_file.exists():
-                logging.warning(f"JSON file does not exist: {json_file}")
-                continue
-                
-            try:
-                entries = self._load_json_file(json_file)
-                
-                # Hash passwords if enabled and not read-only
-                if self.hash_plain_passwords and not self.read_only:
-                    original_entries = entries.copy()
-                    entries = self._upgrade_passwords(entries)
+        Runs under the storage lock and builds the new state in locals,
+        publishing it only once complete, so writers and readers on other
+        threads never see a half-loaded store.
+        """
+        with self._lock:
+            all_entries = []
+            entries_by_file = {}
+            dn_index = {}
+            load_errors = []
+            
+            # One stat per file serves as both the existence check and the cache key
+            existing_files = []
+            for json_file in self.json_files:
+                try:
+                    stat = json_file.stat()
+                except (FileNotFoundError, NotADirectoryError):
+                    logging.warning(f"JSON file does not exist: {json_file}")
+                    continue
+                existing_files.append((json_file, stat))
+            
+            futures = self._parse_files(existing_files)
+            
+            # Parse-cache hits return the very same lists, so if every file came
+            # back unchanged the published state and the built tree are still
+            # current; stop before any per-entry work
+            if (self._root_entry is not None
+                    and [str(json_file) for json_file, _ in existing_files] == list(self._entries_by_file)
+                    and all(future.exception() is None
+                            and future.result() is self._entries_by_file[str(json_file)]
+                            for (json_file, _), future in zip(existing_files, futures))):
+                logging.debug("JSON files unchanged, keeping the existing LDAP tree")
+                return
+            
+            for (json_file, _), future in zip(existing_files, futures):
+                try:
+                    entries = future.result()
                     
-                    # Write back upgraded passwords if any were changed
-                    if entries != original_entries:
-                        try:
-                            with AtomicJSONWriter(
-                                target_path=json_file,
-                                backup_enabled=self.enable_backups,
-                                lock_timeout=self.atomic_write_timeout
-                            ) as writer:
-                                writer.write_json(entries)
-                            logging.info(f"Updated passwords in {json_file}")
-                        except Exception as e:
-                            logging.error(f"Failed to write back password upgrades to {json_file}: {e}")
+                    # Hash passwords if enabled and not read-only
+                    if self.hash_plain_passwords and not self.read_only:
+                        upgraded_entries = self._upgrade_passwords(entries)
+                        
+                        # Write back upgraded passwords if any were changed
+                        if upgraded_entries is not entries:
+                            # Hashing passwords leaves DNs as they were
+                            self._store_dn_keys(str(json_file), upgraded_entries,
+                                                self._dn_keys_for(str(json_file), entries)[0])
+                            entries = upgraded_entries
+                            try:
+                                self._write_entries(json_file, entries)
+                                logging.info(f"Updated passwords in {json_file}")
+                            except Exception as e:
+                                logging.error(f"Failed to write back password upgrades to {json_file}: {e}")
+                        
+                    entries_by_file[str(json_file)] = entries
+                    dn_index[str(json_file)] = self._dn_keys_for(str(json_file), entries)[1]
+                    all_entries.extend(entries)
                     
-                self._entries_by_file[str(json_file)] = entries
-                all_entries.extend(entries)
-                
-                logging.debug(f"Loaded {len(entries)} entries from {json_file}")
-                
-            except Exception as e:
-                logging.error(f"Failed to load JSON file {json_file}: {e}")
-                load_errors.append((json_file, e))
-                
-                # For single file mode, immediately re-raise the error
-                if len(self.json_files) == 1:
-                    raise
-                continue
+                    logging.debug(f"Loaded {len(entries)} entries from {json_file}")
+                    
+                except Exception as e:
+                    logging.error(f"Failed to load JSON file {json_file}: {e}")
+                    load_errors.append((json_file, e))
+                    
+                    # For single file mode, immediately re-raise the error
+                    if len(self.json_files) == 1:
+                        raise
+                    continue
+            
+            # If we have multiple files but none loaded successfully, raise the first error
+            if not all_entries and load_errors:
+                raise load_errors[0][1]
+            
+            # Merge entries according to strategy
+            if len(self.json_files) == 1:
+                merged_entries = all_entries
+                merge_conflicts = 0
+            else:
+                dn_to_entry, merge_conflicts = _merge_entries(
+                    list(entries_by_file.values()), self.merge_strategy,
+                    [self._dn_keys_for(path, entries)[0] for path, entries in entries_by_file.items()]
+                )
+                merged_entries = list(dn_to_entry.values())
+                if merge_conflicts:
+                    logging.warning(f"Resolved {merge_conflicts} DN conflicts using {self.merge_strategy} strategy")
+            
+            # Build LDAP tree. With lazy loading the first build waits for get_root();
+            # once a tree exists it is rebuilt eagerly so handed-out roots stay current.
+            root_entry = self._root_entry
+            if root_entry is not None or not self.enable_lazy_loading:
+                root_entry = self._build_ldap_tree(merged_entries)
+            
+            self._entries_by_file = entries_by_file
+            self._dn_index = dn_index
+            self._all_entries = merged_entries
+            self._merge_conflicts = merge_conflicts
+            self._root_entry = root_entry
+            
+            logging.info(f"Loaded {len(merged_entries)} total entries from {len(self.json_files)} files")
+    
+    def _files_changed_on_disk(self) -> bool:
+        """
+        Check whether any file differs from the version last parsed or written.
         
-        # If we have multiple files but none loaded successfully, raise the first error
-        if not all_entries and load_errors:
-            raise load_errors[0][1]
+        Writes record the committed file in the parse cache, so the watcher
+        events caused by the storage's own writes do not trigger a reload.
+        """
+        for json_file in self.json_files:
+            cached = self._parse_cache.get(str(json_file))
+            try:
+                key = _stat_key(json_file.stat())
+            except (FileNotFoundError, NotADirectoryError):
+                key = None
+            if (cached[0] if cached is not None else None) != key:
+                return True
+        return False
+    
+    def _parse_files(self, files: List[Tuple[Path, os.stat_result]]) -> List[Future]:
+        """
+        Read and parse JSON files, concurrently when there is more than one.
         
-        # Merge entries according to strategy
-        merged_entries = self._merge_entries(all_entries)
-        self._all_entries = merged_entries
+        File reads release the GIL, so federated setups spread over several
+        files (or a slow network filesystem) overlap their I/O.
         
-        # Build LDAP tree
-        self._root_entry = self._build_ldap_tree(merged_entries)
+        Args:
+            files: Existing JSON files to parse, paired with their stat results
+            
+        Returns:
+            One future per file, in the same order as ``files``
+        """
+        if len(files) <= 1:
+            futures = []
+            for json_file, stat in files:
+                future = Future()
+                try:
+                    future.set_result(self._load_json_file_cached(json_file, stat))
+                except Exception as e:
+                    future.set_exception(e)
+                futures.append(future)
+            return futures
         
-        logging.info(f"Loaded {len(merged_entries)} total entries from {len(self.json_files)} files")
+        max_workers = min(len(files), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return [executor.submit(self._load_json_file_cached, f, stat) for f, stat in files]
+    
+    def _load_json_file_cached(self, file_path: Path,
+                               stat: Optional[os.stat_result] = None) -> List[Dict[str, Any]]:
+        """
+        Load a JSON file, reusing the previous parse if the file is unchanged.
+        
+        Files are considered unchanged when their modification time, size
+        and inode all match, so a reload only re-parses files that were
+        actually rewritten. Cached lists are shared with _entries_by_file and
+        must not be mutated in place.
+        
+        Args:
+            file_path: JSON file to load
+            stat: Stat result for the file if the caller already has one
+        """
+        key = _stat_key(stat if stat is not None else file_path.stat())
+        
+        cached = self._parse_cache.get(str(file_path))
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
+        entries = self._load_json_file(file_path)
+        self._parse_cache[str(file_path)] = (key, entries)
+        return entries
     
     def _load_json_file(self, file_path: Path) -> List[Dict[str, Any]]:
         """Load and validate entries from a single JSON file."""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # Read the whole file in one call and let the parser decode the bytes directly
+        with open(file_path, 'rb') as f:
+            raw = f.read()
+            if len(raw) >= PAGE_CACHE_DROP_MIN_BYTES:
+                _drop_page_cache(f.fileno())
+        if _is_ndjson(file_path):
+            # One entry per line; blank lines are allowed
+            lines = raw.splitlines()
+            if lines and not raw.endswith(b'\n') and self._may_be_torn_append(file_path, raw):
+                # An unterminated, unparsable last line is a torn append; drop it
+                try:
+                    _json_loads(lines[-1])
+                except ValueError:
+                    logging.warning(f"Ignoring incomplete last line in {file_path}")
+                    lines.pop()
+            data = [_json_loads(line) for line in lines if line.strip()]
+        else:
+            data = _json_loads(raw)
         
         # Support both old format (dict with entries list) and new format (direct list)
         if isinstance(data, dict):
@@ -385,167 +849,282 @@ class JSONStorage:
         else:
             raise ValueError("JSON root must be a list of entries or dict with 'entries' key")
         
-        # Validate entry format
+        self._validate_entries(entries)
+        
+        # objectClass values repeat across nearly every entry; share one string
+        # each. The entries were just parsed and are not shared with anything yet.
+        for entry in entries:
+            attributes = entry['attributes']
+            object_classes = attributes.get('objectClass')
+            if object_classes:
+                attributes['objectClass'] = [
+                    sys.intern(value) if isinstance(value, str) else value for value in object_classes
+                ]
+        return entries
+    
+    def _may_be_torn_append(self, file_path: Path, raw: bytes) -> bool:
+        """
+        Check whether an unterminated last line could come from our own append.
+        
+        That is only the case if the file is still the one last parsed or
+        written and the line starts at or past its size back then. Anything
+        else, such as a typo in a hand-edited file, is a real parse error.
+        """
+        cached = self._parse_cache.get(str(file_path))
+        if cached is None:
+            return False
+        _, known_size, known_inode = cached[0]
+        try:
+            inode = file_path.stat().st_ino
+        except OSError:
+            return False
+        return inode == known_inode and raw.rfind(b'\n') + 1 >= known_size
+    
+    def _entries_for_write(self, file_path: Path) -> List[Dict[str, Any]]:
+        """
+        Get the loaded entries of a file about to be written.
+        
+        Raises:
+            ValueError: If the file exists but failed to load, so it is never
+                overwritten with only the new entries
+        """
+        entries = self._entries_by_file.get(str(file_path))
+        if entries is None:
+            if file_path.exists():
+                raise ValueError(f"{file_path} exists but is not loaded; refusing to overwrite it")
+            return []
+        return entries
+    
+    def _validate_entries(self, entries: List[Dict[str, Any]]) -> None:
+        """
+        Validate entry format without modifying the entries.
+        
+        Raises:
+            ValueError: If an entry is malformed
+        """
+        # Validate entry format in a single pass, looking up each field once
         for i, entry in enumerate(entries):
             if not isinstance(entry, dict):
                 raise ValueError(f"Entry {i} must be a dict")
             if 'dn' not in entry:
                 raise ValueError(f"Entry {i} missing 'dn' field")
-            if 'attributes' not in entry:
-                raise ValueError(f"Entry {i} missing 'attributes' field")
-            if not isinstance(entry['attributes'], dict):
+            attributes = entry.get('attributes')
+            if not isinstance(attributes, dict):
+                if 'attributes' not in entry:
+                    raise ValueError(f"Entry {i} missing 'attributes' field")
                 raise ValueError(f"Entry {i} 'attributes' must be a dict")
             
             # Validate attribute values are lists
-            for attr_name, attr_values in entry['attributes'].items():
+            for attr_name, attr_values in attributes.items():
                 if not isinstance(attr_values, list):
                     raise ValueError(f"Entry {i} attribute '{attr_name}' values must be a list")
-        
-        return entries
     
     def _upgrade_passwords(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Upgrade plain text passwords to secure hashes."""
-        upgraded_entries = []
+        """
+        Upgrade plain text passwords to secure hashes.
         
-        for entry in entries:
-            updated_entry = entry.copy()
-            attributes = updated_entry.get('attributes', {}).copy()
-            
-            if 'userPassword' in attributes:
-                passwords = attributes['userPassword']
-                hashed_passwords = []
-                
-                for password in passwords:
-                    if not password.startswith('{') and not password.startswith('$'):
-                        # Plain text password - hash it
-                        hashed_password = PasswordManager.hash_password(password)
-                        hashed_passwords.append(hashed_password)
-                        logging.info(f"Upgraded password for {updated_entry.get('dn', 'unknown')}")
-                    else:
-                        # Already hashed
-                        hashed_passwords.append(password)
-                
-                attributes['userPassword'] = hashed_passwords
-                updated_entry['attributes'] = attributes
-            
-            upgraded_entries.append(updated_entry)
+        All plain text values are hashed in one parallel batch. Only entries
+        with a changed password are copied; if nothing needs hashing, the
+        input list itself is returned.
+        """
+        plain_passwords = []  # (entry position, value position, password)
+        for i, entry in enumerate(entries):
+            passwords = entry.get('attributes', {}).get('userPassword', [])
+            for j, password in enumerate(passwords):
+                if not password.startswith('{') and not password.startswith('$'):
+                    plain_passwords.append((i, j, password))
+        
+        if not plain_passwords:
+            return entries
+        
+        hashed = PasswordManager.hash_passwords([password for _, _, password in plain_passwords])
+        
+        upgraded_entries = list(entries)
+        for (i, j, _), hashed_password in zip(plain_passwords, hashed):
+            entry = upgraded_entries[i]
+            if entry is entries[i]:
+                # Copy on first change so the caller's entries stay untouched
+                attributes = dict(entry['attributes'])
+                attributes['userPassword'] = list(attributes['userPassword'])
+                entry = upgraded_entries[i] = {**entry, 'attributes': attributes}
+            entry['attributes']['userPassword'][j] = hashed_password
+            logging.info(f"Upgraded password for {entry.get('dn', 'unknown')}")
         
         return upgraded_entries
     
-    def _merge_entries(self, all_entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Merge entries from multiple files according to merge strategy."""
-        if len(self.json_files) == 1:
-            return all_entries
+    def _write_entries(self, file_path: Path, entries: List[Dict[str, Any]]) -> None:
+        """
+        Atomically write a file's entries and record them as its parsed contents.
+        
+        The reload that follows a write then finds the file unchanged and
+        reuses these entries instead of reading back what was just written.
+        """
+        self._validate_entries(entries)
+        with self._atomic_writer(file_path) as writer:
+            writer.write_json(entries)
+        self._parse_cache[str(file_path)] = (_stat_key(writer.committed_stat), entries)
+    
+    def _append_entries(self, file_path: Path, new_entries: List[Dict[str, Any]],
+                        entries: List[Dict[str, Any]]) -> None:
+        """
+        Append new entries to an NDJSON file and record the resulting contents.
         
-        dn_to_entry = {}
-        dn_sources = {}  # Track which file each DN came from
+        Falls back to rewriting the whole file if it changed on disk since it
+        was loaded or ends in a torn line, so the recorded entries always
+        match the file.
         
-        for entry in all_entries:
-            dn = entry['dn']
+        Args:
+            file_path: NDJSON file to append to
+            new_entries: Entries to append
+            entries: Full entry list for the file after the append
+        """
+        self._validate_entries(new_entries)
+        cached = self._parse_cache.get(str(file_path))
+        
+        with self._atomic_writer(file_path) as writer:
+            try:
+                current_key = _stat_key(file_path.stat())
+            except FileNotFoundError:
+                current_key = None
             
-            if dn not in dn_to_entry:
-                dn_to_entry[dn] = entry
-                dn_sources[dn] = [entry]
+            if cached is not None and cached[0] == current_key and _ends_with_newline(file_path):
+                writer.append_json(new_entries)
             else:
-                dn_sources[dn].append(entry)
-                
-                if self.merge_strategy == "first_wins":
-                    # Keep first occurrence
-                    continue
-                elif self.merge_strategy == "last_wins":
-                    # Use latest occurrence
-                    dn_to_entry[dn] = entry
-                elif self.merge_strategy == "error":
-                    raise ValueError(f"Duplicate DN found with error merge strategy: {dn}")
-                else:
-                    raise ValueError(f"Unknown merge strategy: {self.merge_strategy}")
+                writer.write_json(entries)
         
-        # Log conflicts
-        conflicts = {dn: sources for dn, sources in dn_sources.items() if len(sources) > 1}
-        if conflicts:
-            logging.warning(f"Resolved {len(conflicts)} DN conflicts using {self.merge_strategy} strategy")
+        self._parse_cache[str(file_path)] = (_stat_key(writer.committed_stat), entries)
+    
+    def _dn_keys_for(self, file_path: str,
+                     entries: List[Dict[str, Any]]) -> Tuple[List[str], Dict[str, int]]:
+        """
+        Get the normalized DN of each entry in a file and the file's DN index.
         
-        return list(dn_to_entry.values())
+        Results are cached per file and reused while its entry list is the
+        same object, so files a reload did not re-parse are not re-indexed.
+        """
+        cached = self._dn_key_cache.get(file_path)
+        if cached is not None and cached[0] is entries:
+            return cached[1], cached[2]
+        return self._store_dn_keys(file_path, entries, [_normalize_dn(entry['dn']) for entry in entries])
+    
+    def _store_dn_keys(self, file_path: str, entries: List[Dict[str, Any]],
+                       dn_keys: List[str]) -> Tuple[List[str], Dict[str, int]]:
+        """
+        Record the normalized DNs of a file's entries and index them.
+        
+        Writers call this with keys derived from the previous entries, so
+        only the DNs they touched are ever normalized.
+        """
+        index = {}
+        for i, key in enumerate(dn_keys):
+            index.setdefault(key, i)  # Keep the first occurrence
+        self._dn_key_cache[file_path] = (entries, dn_keys, index)
+        return dn_keys, index
+    
+    def _locate_entry(self, dn: str) -> Optional[Tuple[str, int]]:
+        """Find the file and position holding a DN, searching files in order."""
+        key = _normalize_dn(dn)
+        for file_path, index in self._dn_index.items():
+            if key in index:
+                return file_path, index[key]
+        return None
+    
+    def _hash_new_passwords(self, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Hash plain text passwords in entries before they are written.
+        
+        Doing this up front means the reload after a write finds nothing to
+        upgrade, so each write operation rewrites the file exactly once.
+        """
+        if not self.hash_plain_passwords:
+            return entries
+        return self._upgrade_passwords(entries)
     
     def _build_ldap_tree(self, entries: List[Dict[str, Any]]) -> LDIFTreeEntry:
-        """Build LDAP tree structure from flat entry list."""
-        # Create root entry with temp directory path
-        root = LDIFTreeEntry(self._temp_dir)
+        """
+        Build LDAP tree structure from flat entry list.
         
+        Each build fills a fresh directory and then atomically repoints the
+        tree symlink at it, so searches never see a partially built tree and
+        root handles already given out (e.g. the server factory's) follow
+        the link to the new data.
+        """
+        build_dir = tempfile.mkdtemp(prefix="tree.", dir=self._temp_dir)
+        try:
+            self._fill_tree_dir(build_dir, entries)
+        except Exception:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            raise
+        
+        self._switch_tree_dir(build_dir)
+        return LDIFTreeEntry(self._tree_path)
+    
+    def _fill_tree_dir(self, tree_dir: str, entries: List[Dict[str, Any]]):
+        """Write all entries, and any missing parents, into an LDIF tree directory."""
         # Group entries by their DN for easy lookup
         entries_by_dn = {entry["dn"]: entry["attributes"] for entry in entries}
-        created_entries = {"": root}  # Root entry with empty DN
+        created_dns = {""}  # Root entry with empty DN
         
         # Process entries in order of DN depth (shortest first)
         sorted_dns = sorted(entries_by_dn.keys(), key=lambda dn: dn.count(','))
         
         for dn_str in sorted_dns:
-            attributes = entries_by_dn[dn_str]
-            
             try:
                 # Parse DN
-                dn = distinguishedname.DistinguishedName(stringValue=dn_str)
-                
-                # Get the RDN (first component)
-                dn_components = list(dn.split())
-                if not dn_components:
+                dn = _parse_dn(dn_str)
+                if not dn.split():
                     continue
                 
-                rdn = dn_components[0].getText()
-                
-                # Find parent DN
-                if len(dn_components) > 1:
-                    # Build parent DN string by joining remaining components
-                    parent_components = dn_components[1:]
-                    parent_dn_str = ",".join([comp.getText() for comp in parent_components])
-                else:
-                    parent_dn_str = ""
-                
-                # Get or create parent entry
-                parent_entry = created_entries.get(parent_dn_str)
-                if parent_entry is None:
-                    # Create missing parent entries
-                    parent_entry = self._ensure_parent_exists(parent_dn_str, created_entries, root)
-                
-                # Create this entry
-                child_entry = parent_entry.addChild(rdn, attributes)
-                created_entries[dn_str] = child_entry
+                # Create missing parent entries, then this entry
+                self._ensure_parent_exists(tree_dir, dn.up(), created_dns)
+                self._put_entry(tree_dir, dn, entries_by_dn[dn_str])
+                created_dns.add(dn.getText())
                 logging.debug(f"Created entry: {dn_str}")
                 
             except Exception as e:
                 logging.error(f"Failed to create entry {dn_str}: {e}")
                 continue
-        
-        return root
     
-    def _ensure_parent_exists(self, parent_dn_str: str, created_entries: Dict[str, LDIFTreeEntry], root: LDIFTreeEntry) -> LDIFTreeEntry:
-        """Ensure parent entry exists, creating intermediate entries if needed."""
-        if not parent_dn_str or parent_dn_str in created_entries:
-            return created_entries.get(parent_dn_str, root)
-        
-        # Parse parent DN
+    def _switch_tree_dir(self, build_dir: str):
+        """Atomically point the tree symlink at a new build and remove the old one."""
         try:
-            parent_dn = distinguishedname.DistinguishedName(stringValue=parent_dn_str)
-            parent_components = list(parent_dn.split())
-        except Exception as e:
-            logging.debug(f"Could not parse parent DN {parent_dn_str}: {e}")
-            return root
+            old_dir = os.path.join(self._temp_dir, os.readlink(self._tree_path))
+        except FileNotFoundError:
+            old_dir = None
         
-        if not parent_components:
-            return root
+        # Relative link target, swapped in with a single rename
+        link_tmp = f"{build_dir}.link"
+        os.symlink(os.path.basename(build_dir), link_tmp)
+        os.replace(link_tmp, self._tree_path)
         
-        # Get grandparent
-        if len(parent_components) > 1:
-            grandparent_components = parent_components[1:]
-            grandparent_dn_str = ",".join([comp.getText() for comp in grandparent_components])
-        else:
-            grandparent_dn_str = ""
+        if old_dir is not None:
+            shutil.rmtree(old_dir, ignore_errors=True)
+    
+    def _put_entry(self, tree_dir: str, dn: distinguishedname.DistinguishedName,
+                   attributes: Dict[str, List[str]]):
+        """
+        Write a single entry into the LDIF tree directory.
+        
+        Unlike LDIFTreeEntry.addChild, this does not re-read every sibling to
+        check for duplicates; DNs are already unique after merging.
+        """
+        failures = []
+        ldiftree.put(tree_dir, BaseLDAPEntry(dn, attributes)).addErrback(failures.append)
+        if failures:
+            failures[0].raiseException()
+    
+    def _ensure_parent_exists(self, tree_dir: str, parent_dn: distinguishedname.DistinguishedName,
+                              created_dns: Set[str]):
+        """Ensure parent entry exists, creating intermediate entries if needed."""
+        parent_dn_str = parent_dn.getText()
+        if parent_dn_str in created_dns:
+            return
         
         # Recursively ensure grandparent exists
-        grandparent_entry = self._ensure_parent_exists(grandparent_dn_str, created_entries, root)
+        self._ensure_parent_exists(tree_dir, parent_dn.up(), created_dns)
         
         # Create parent entry
-        parent_rdn = parent_components[0].getText()
+        parent_rdn = parent_dn.split()[0].getText()
         
         # Extract attribute type and value from RDN
         if '=' in parent_rdn:
@@ -566,11 +1145,9 @@ class JSONStorage:
         elif rdn_attr == 'cn':
             parent_attributes['objectClass'].append('organizationalRole')
         
-        parent_entry = grandparent_entry.addChild(parent_rdn, parent_attributes)
-        created_entries[parent_dn_str] = parent_entry
+        self._put_entry(tree_dir, parent_dn, parent_attributes)
+        created_dns.add(parent_dn_str)
         logging.debug(f"Created intermediate parent entry: {parent_dn_str}")
-        
-        return parent_entry
     
     def _start_file_watching(self):
         """Start file system watcher for hot reload."""
@@ -607,6 +1184,8 @@ class JSONStorage:
             except Exception as e:
                 logging.error(f"Error stopping file watcher: {e}")
             finally:
+                if self._file_watcher is not None:
+                    self._file_watcher.cancel()
                 self._observer = None
                 self._file_watcher = None
     
@@ -638,14 +1217,24 @@ class JSONStorage:
     
     def get_root(self) -> LDIFTreeEntry:
         """Get the root entry of the LDAP directory tree."""
-        return self._root_entry
+        with self._lock:
+            if self._root_entry is None:
+                self._root_entry = self._build_ldap_tree(self._all_entries)
+            return self._root_entry
     
     def cleanup(self) -> None:
         """Clean up resources."""
         self._stop_file_watching()
         
-        if os.path.exists(self._temp_dir):
-            shutil.rmtree(self._temp_dir)
+        # A reload already running on the watcher's timer thread holds the
+        # lock; wait for it, and make any later one a no-op
+        with self._lock:
+            self._closed = True
+            self._parse_cache.clear()
+            self._dn_key_cache.clear()
+            
+            if os.path.exists(self._temp_dir):
+                shutil.rmtree(self._temp_dir)
         
         logging.info("JSON storage cleaned up")
     
@@ -657,6 +1246,7 @@ class JSONStorage:
             'files': [str(f) for f in self.json_files],
             'read_only': self.read_only,
             'merge_strategy': self.merge_strategy,
+            'merge_conflicts': self._merge_conflicts,
             'file_watching_enabled': self.enable_file_watching,
             'lazy_loading_enabled': self.enable_lazy_loading,
             'entries_by_file': {k: len(v) for k, v in self._entries_by_file.items()}
@@ -671,40 +1261,44 @@ class JSONStorage:
             return False
         
         try:
-            # Determine target file
-            if target_file:
-                file_path = Path(target_file)
-            else:
-                file_path = self._find_target_file(dn)
-            
-            # Load current entries from target file
-            current_entries = self._entries_by_file.get(str(file_path), [])
-            
-            # Check for duplicate DN
-            for entry in current_entries:
-                if entry['dn'] == dn:
+            with self._lock:
+                # Determine target file
+                if target_file:
+                    file_path = Path(target_file)
+                else:
+                    file_path = self._find_target_file(dn)
+                
+                # Load current entries from target file
+                current_entries = self._entries_for_write(file_path)
+                
+                # Check for duplicate DN
+                dn_key = _normalize_dn(dn)
+                if dn_key in self._dn_index.get(str(file_path), {}):
                     logging.warning(f"Entry with DN {dn} already exists")
                     return False
-            
-            # Create new entry
-            new_entry = {
-                'dn': dn,
-                'attributes': attributes
-            }
-            
-            # Add to entries list
-            updated_entries = current_entries + [new_entry]
-            
-            # Write atomically
-            with AtomicJSONWriter(file_path, self.enable_backups, self.atomic_write_timeout) as writer:
-                writer.write_json(updated_entries)
-            
-            # Reload all data
-            self._load_all_files()
-            
-            logging.info(f"Added entry {dn} to {file_path}")
-            return True
-            
+                
+                # Create new entry
+                new_entry, = self._hash_new_passwords([{
+                    'dn': dn,
+                    'attributes': copy.deepcopy(attributes)
+                }])
+                
+                # Add to entries list
+                updated_entries = current_entries + [new_entry]
+                
+                # Write (NDJSON files just get the new line appended), then rebuild
+                # from the entries just written
+                dn_keys = self._dn_keys_for(str(file_path), current_entries)[0]
+                if _is_ndjson(file_path):
+                    self._append_entries(file_path, [new_entry], updated_entries)
+                else:
+                    self._write_entries(file_path, updated_entries)
+                self._store_dn_keys(str(file_path), updated_entries, dn_keys + [dn_key])
+                self._load_all_files()
+                
+                logging.info(f"Added entry {dn} to {file_path}")
+                return True
+                
         except Exception as e:
             logging.error(f"Failed to add entry {dn}: {e}")
             return False
@@ -716,26 +1310,31 @@ class JSONStorage:
             return False
         
         try:
-            # Find entry in files
-            for file_path, entries in self._entries_by_file.items():
-                for i, entry in enumerate(entries):
-                    if entry['dn'] == dn:
-                        # Update entry
-                        entries[i]['attributes'] = new_attributes
-                        
-                        # Write atomically
-                        with AtomicJSONWriter(Path(file_path), self.enable_backups, self.atomic_write_timeout) as writer:
-                            writer.write_json(entries)
-                        
-                        # Reload all data
-                        self._load_all_files()
-                        
-                        logging.info(f"Modified entry {dn} in {file_path}")
-                        return True
-            
-            logging.warning(f"Entry {dn} not found for modification")
-            return False
-            
+            with self._lock:
+                # Find entry in files
+                location = self._locate_entry(dn)
+                if location is None:
+                    logging.warning(f"Entry {dn} not found for modification")
+                    return False
+                
+                file_path, i = location
+                entries = self._entries_by_file[file_path]
+                
+                # Update entry without touching the loaded entry lists
+                updated_entry, = self._hash_new_passwords([
+                    {**entries[i], 'attributes': copy.deepcopy(new_attributes)}
+                ])
+                updated_entries = entries[:i] + [updated_entry] + entries[i+1:]
+                
+                # Write atomically, then rebuild from the entries just written
+                dn_keys = self._dn_keys_for(file_path, entries)[0]
+                self._write_entries(Path(file_path), updated_entries)
+                self._store_dn_keys(file_path, updated_entries, dn_keys)
+                self._load_all_files()
+                
+                logging.info(f"Modified entry {dn} in {file_path}")
+                return True
+                
         except Exception as e:
             logging.error(f"Failed to modify entry {dn}: {e}")
             return False
@@ -747,26 +1346,26 @@ class JSONStorage:
             return False
         
         try:
-            # Find and remove entry from files
-            for file_path, entries in self._entries_by_file.items():
-                for i, entry in enumerate(entries):
-                    if entry['dn'] == dn:
-                        # Remove entry
-                        updated_entries = entries[:i] + entries[i+1:]
-                        
-                        # Write atomically
-                        with AtomicJSONWriter(Path(file_path), self.enable_backups, self.atomic_write_timeout) as writer:
-                            writer.write_json(updated_entries)
-                        
-                        # Reload all data
-                        self._load_all_files()
-                        
-                        logging.info(f"Deleted entry {dn} from {file_path}")
-                        return True
-            
-            logging.warning(f"Entry {dn} not found for deletion")
-            return False
-            
+            with self._lock:
+                # Find and remove entry from files
+                location = self._locate_entry(dn)
+                if location is None:
+                    logging.warning(f"Entry {dn} not found for deletion")
+                    return False
+                
+                file_path, i = location
+                entries = self._entries_by_file[file_path]
+                updated_entries = entries[:i] + entries[i+1:]
+                
+                # Write atomically, then rebuild from the entries just written
+                dn_keys = self._dn_keys_for(file_path, entries)[0]
+                self._write_entries(Path(file_path), updated_entries)
+                self._store_dn_keys(file_path, updated_entries, dn_keys[:i] + dn_keys[i+1:])
+                self._load_all_files()
+                
+                logging.info(f"Deleted entry {dn} from {file_path}")
+                return True
+                
         except Exception as e:
             logging.error(f"Failed to delete entry {dn}: {e}")
             return False
@@ -778,41 +1377,40 @@ class JSONStorage:
             return False
         
         try:
-            # Validate all entries first
-            for i, entry in enumerate(entries):
-                if 'dn' not in entry or 'attributes' not in entry:
-                    logging.error(f"Invalid entry format at index {i}")
-                    return False
-            
-            # Determine target file
-            if target_file:
-                file_path = Path(target_file)
-            else:
-                if len(self.json_files) > 1:
-                    logging.error("Bulk write in federated mode requires explicit target_file specification")
-                    return False
-                file_path = self.json_files[0]
-            
-            # Load current entries
-            current_entries = self._entries_by_file.get(str(file_path), [])
-            
-            # Merge with new entries (replace if DN exists)
-            entry_map = {entry['dn']: entry for entry in current_entries}
-            for entry in entries:
-                entry_map[entry['dn']] = entry
-            
-            updated_entries = list(entry_map.values())
-            
-            # Write atomically
-            with AtomicJSONWriter(file_path, self.enable_backups, self.atomic_write_timeout) as writer:
-                writer.write_json(updated_entries)
-            
-            # Reload all data
-            self._load_all_files()
-            
-            logging.info(f"Bulk wrote {len(entries)} entries to {file_path}")
-            return True
-            
+            with self._lock:
+                # Validate all entries first
+                for i, entry in enumerate(entries):
+                    if 'dn' not in entry or 'attributes' not in entry:
+                        logging.error(f"Invalid entry format at index {i}")
+                        return False
+                
+                # Determine target file
+                if target_file:
+                    file_path = Path(target_file)
+                else:
+                    if len(self.json_files) > 1:
+                        logging.error("Bulk write in federated mode requires explicit target_file specification")
+                        return False
+                    file_path = self.json_files[0]
+                
+                # Load current entries
+                current_entries = self._entries_for_write(file_path)
+                
+                # Merge with new entries (replace if DN exists)
+                entry_map = dict(zip(self._dn_keys_for(str(file_path), current_entries)[0], current_entries))
+                for entry in self._hash_new_passwords(copy.deepcopy(entries)):
+                    entry_map[_normalize_dn(entry['dn'])] = entry
+                
+                updated_entries = list(entry_map.values())
+                
+                # Write atomically, then rebuild from the entries just written
+                self._write_entries(file_path, updated_entries)
+                self._store_dn_keys(str(file_path), updated_entries, list(entry_map))
+                self._load_all_files()
+                
+                logging.info(f"Bulk wrote {len(entries)} entries to {file_path}")
+                return True
+                
         except Exception as e:
             logging.error(f"Failed to bulk write entries: {e}")
             return False
@@ -2,7 +2,7 @@
 Unit tests for atomic write operations in JSON storage.
 """
 import pytest
-import tempfile
+import errno
 import json
 import os
 import time
@@ -17,16 +17,11 @@ from src.ldap_server.storage.json import (
 
 
 @pytest.fixture
-def temp_json_file():
+def temp_json_file(tmp_path):
     """Create a temporary JSON file for testing."""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        temp_path = Path(f.name)
-        
-    yield temp_path
-    
-    # Cleanup
-    if temp_path.exists():
-        temp_path.unlink()
+    temp_path = tmp_path / "data.json"
+    temp_path.touch()
+    return temp_path
 
 
 @pytest.fixture
@@ -98,6 +93,71 @@ class TestAtomicJSONWriter:
         
         assert written_data == test_data
         
+    def test_atomic_writer_without_fsync(self, temp_json_file):
+        """Test that fsync=False skips the flush to disk but still writes."""
+        test_data = [{"dn": "dc=test,dc=com", "attributes": {"dc": ["test"]}}]
+        
+        with patch("src.ldap_server.storage.json.os.fsync") as mock_fsync:
+            with AtomicJSONWriter(temp_json_file, fsync=False) as writer:
+                writer.write_json(test_data)
+            mock_fsync.assert_not_called()
+        
+        with open(temp_json_file, 'r') as f:
+            assert json.load(f) == test_data
+    
+    def test_atomic_writer_compact_output(self, temp_json_file):
+        """Test that pretty_print=False writes a single compact JSON line."""
+        test_data = [{"dn": "dc=test,dc=com", "attributes": {"dc": ["test"]}}]
+        
+        with AtomicJSONWriter(temp_json_file, pretty_print=False) as writer:
+            writer.write_json(test_data)
+        
+        content = temp_json_file.read_text()
+        assert "\n" not in content
+        assert json.loads(content) == test_data
+    
+    def test_atomic_writer_directory_fsync(self, temp_json_file):
+        """Test that durable writes sync the directory and tolerate EINVAL."""
+        def entries(name):
+            return [{"dn": f"dc={name},dc=com", "attributes": {"dc": [name]}}]
+        
+        with patch("src.ldap_server.storage.json.os.fsync") as mock_fsync:
+            with AtomicJSONWriter(temp_json_file) as writer:
+                writer.write_json(entries("first"))
+            assert mock_fsync.call_count == 2  # temp file, then directory
+        
+        with patch("src.ldap_server.storage.json.os.fsync") as mock_fsync:
+            with AtomicJSONWriter(temp_json_file, durable=False) as writer:
+                writer.write_json(entries("second"))
+            assert mock_fsync.call_count == 1
+        
+        # Directory fsync unsupported by the filesystem
+        dir_fsync_error = OSError(errno.EINVAL, "Invalid argument")
+        with patch("src.ldap_server.storage.json.os.fsync", side_effect=[None, dir_fsync_error]):
+            with AtomicJSONWriter(temp_json_file) as writer:
+                writer.write_json(entries("third"))
+        
+        with open(temp_json_file, 'r') as f:
+            assert json.load(f) == entries("third")
+    
+    def test_atomic_writer_skips_unchanged_content(self, temp_json_file):
+        """Test that rewriting identical content touches neither file nor backups."""
+        test_data = [{"dn": "dc=test,dc=com", "attributes": {"dc": ["test"]}}]
+        
+        with AtomicJSONWriter(temp_json_file, backup_enabled=False) as writer:
+            writer.write_json(test_data)
+        inode = temp_json_file.stat().st_ino
+        
+        with patch("src.ldap_server.storage.json.os.fsync") as mock_fsync:
+            with AtomicJSONWriter(temp_json_file, backup_enabled=True) as writer:
+                writer.write_json(test_data)
+            mock_fsync.assert_not_called()
+        
+        assert temp_json_file.stat().st_ino == inode
+        assert writer.committed_stat.st_ino == inode
+        assert list(temp_json_file.parent.glob(f"{temp_json_file.name}.*.bak")) == []
+        assert list(temp_json_file.parent.glob("*.tmp")) == []
+    
     def test_atomic_writer_backup_creation(self, temp_json_file):
         """Test that backups are created before writing."""
         original_data = [{"dn": "dc=original,dc=com", "attributes": {}}]
@@ -180,6 +240,34 @@ class TestAtomicJSONWriter:
             final_data = json.load(f)
         assert len(final_data) == 1
     
+    def test_atomic_writer_threads_queue_without_polling(self, temp_json_file):
+        """Test that threads of one process wait for each other without polling flock."""
+        holder_ready = threading.Event()
+        release = threading.Event()
+        
+        def hold_lock():
+            with AtomicJSONWriter(temp_json_file) as writer:
+                holder_ready.set()
+                release.wait(timeout=5.0)
+                writer.write_json([{"dn": "dc=first,dc=com", "attributes": {}}])
+        
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        assert holder_ready.wait(timeout=5.0)
+        
+        with patch("src.ldap_server.storage.json.time.sleep") as mock_sleep:
+            threading.Timer(0.2, release.set).start()
+            with AtomicJSONWriter(temp_json_file, lock_timeout=5.0) as writer:
+                writer.write_json([{"dn": "dc=second,dc=com", "attributes": {}}])
+            mock_sleep.assert_not_called()
+        
+        holder.join(timeout=5.0)
+        with open(temp_json_file, 'r') as f:
+            assert json.load(f)[0]["dn"] == "dc=second,dc=com"
+        
+        # The per-path lock is dropped once no writer uses it
+        assert os.path.abspath(temp_json_file) not in AtomicJSONWriter._thread_locks
+    
     def test_atomic_writer_lock_timeout(self, temp_json_file):
         """Test lock timeout functionality."""
         lock_acquired = threading.Event()
@@ -218,7 +306,7 @@ class TestUnifiedJSONStorageWriteOperations:
     def setup_test_data(self, temp_json_file, sample_entries):
         """Set up test data before each test."""
         with open(temp_json_file, 'w') as f:
-            json.dump(sample_entries, f, indent=2)
+            json.dump(sample_entries, f)
     
     def test_add_entry(self, temp_json_file, sample_entries):
         """Test adding a new entry."""
@@ -265,6 +353,41 @@ class TestUnifiedJSONStorageWriteOperations:
         assert modified_entry is not None
         assert modified_entry["attributes"]["cn"] == ["John Smith Updated"]
     
+    def test_dn_lookup_ignores_case_and_spacing(self, temp_json_file, sample_entries):
+        """Test that writes match DNs regardless of case and spacing."""
+        storage = JSONStorage(json_file_paths=[temp_json_file])
+        
+        result = storage.add_entry(
+            "UID=John, OU=Users, DC=Example, DC=Com",
+            {"cn": ["John Smith"]},
+            target_file=temp_json_file
+        )
+        assert result is False
+        
+        result = storage.modify_entry(
+            "UID=John, OU=Users, DC=Example, DC=Com",
+            {"cn": ["John Smith Updated"]}
+        )
+        assert result is True
+        
+        # The stored DN keeps its original spelling
+        modified_entry = get_entry_from_file(temp_json_file, "uid=john,ou=users,dc=example,dc=com")
+        assert modified_entry["attributes"]["cn"] == ["John Smith Updated"]
+    
+    def test_dn_lookup_keeps_escaped_commas(self, temp_json_file, sample_entries):
+        """Test that escaped commas stay inside their RDN when matching DNs."""
+        storage = JSONStorage(json_file_paths=[temp_json_file])
+        
+        assert storage.add_entry("cn=Smith\\, John,ou=users,dc=example,dc=com", {"cn": ["Smith, John"]})
+        assert storage.add_entry("cn=Smith\\,John,ou=users,dc=example,dc=com", {"cn": ["Smith,John"]})
+        
+        # Spacing around '=' and ',' is not significant
+        assert storage.add_entry("CN = Smith\\, John , ou=users,dc=example,dc=com", {"cn": ["x"]}) is False
+        assert storage.delete_entry("cn = smith\\,john, ou=users, dc=example, dc=com") is True
+        
+        assert verify_entry_in_file(temp_json_file, "cn=Smith\\, John,ou=users,dc=example,dc=com")
+        assert not verify_entry_in_file(temp_json_file, "cn=Smith\\,John,ou=users,dc=example,dc=com")
+    
     def test_modify_nonexistent_entry(self, temp_json_file, sample_entries):
         """Test modifying a non-existent entry."""
         storage = JSONStorage(json_file_paths=[temp_json_file])
@@ -321,6 +444,34 @@ class TestUnifiedJSONStorageWriteOperations:
         assert verify_entry_in_file(temp_json_file, "uid=alice,ou=users,dc=example,dc=com")
         assert verify_entry_in_file(temp_json_file, "uid=bob,ou=users,dc=example,dc=com")
     
+    def test_bulk_write_hashes_passwords_in_one_write(self, temp_json_file, sample_entries):
+        """Test that plain text passwords are hashed before the single bulk write."""
+        storage = JSONStorage(json_file_paths=[temp_json_file], enable_file_watching=False)
+        
+        new_entries = [
+            {
+                "dn": "uid=carol,ou=users,dc=example,dc=com",
+                "attributes": {
+                    "uid": ["carol"],
+                    "objectClass": ["top", "person"],
+                    "userPassword": ["carolpassword"]
+                }
+            }
+        ]
+        
+        try:
+            with patch.object(AtomicJSONWriter, "write_json", autospec=True,
+                              side_effect=AtomicJSONWriter.write_json) as mock_write:
+                assert storage.bulk_write_entries(new_entries, temp_json_file) is True
+            assert mock_write.call_count == 1
+            
+            with open(temp_json_file, 'r') as f:
+                written = {entry["dn"]: entry for entry in json.load(f)}
+            password = written["uid=carol,ou=users,dc=example,dc=com"]["attributes"]["userPassword"][0]
+            assert password.startswith("{BCRYPT}")
+        finally:
+            storage.cleanup()
+    
     def test_bulk_write_invalid_entries(self, temp_json_file, sample_entries):
         """Test bulk writing with some invalid entries."""
         storage = JSONStorage(json_file_paths=[temp_json_file], enable_file_watching=False)
@@ -353,7 +504,7 @@ class TestJSONStorageWriteOperations:
     def setup_test_data(self, temp_json_file, sample_entries):
         """Set up test data before each test."""
         with open(temp_json_file, 'w') as f:
-            json.dump(sample_entries, f, indent=2)
+            json.dump(sample_entries, f)
     
     def test_add_entry_legacy(self, temp_json_file, sample_entries):
         """Test adding entry with unified JSONStorage."""
@@ -423,11 +574,9 @@ class TestJSONStorageWriteOperations:
 class TestAtomicWriteErrorScenarios:
     """Test error scenarios and edge cases."""
     
-    def test_write_to_nonexistent_directory(self):
+    def test_write_to_nonexistent_directory(self, tmp_path):
         """Test writing to a nonexistent directory."""
-        import shutil
-        
-        nonexistent_path = Path("/tmp/nonexistent_dir_12345/test.json")
+        nonexistent_path = tmp_path / "nonexistent_dir" / "test.json"
         
         # Should create directory automatically
         with AtomicJSONWriter(nonexistent_path) as writer:
@@ -435,14 +584,11 @@ class TestAtomicWriteErrorScenarios:
         
         # Verify file was created
         assert nonexistent_path.exists()
-        
-        # Cleanup - remove entire directory tree
-        shutil.rmtree(nonexistent_path.parent)
     
     def test_disk_space_error_simulation(self, temp_json_file):
         """Test handling of disk space errors during write."""
-        with patch('json.dump') as mock_dump:
-            mock_dump.side_effect = OSError("No space left on device")
+        with patch('src.ldap_server.storage.json.os.fsync') as mock_fsync:
+            mock_fsync.side_effect = OSError("No space left on device")
             
             with pytest.raises(RuntimeError, match="Failed to write JSON data"):
                 with AtomicJSONWriter(temp_json_file) as writer:
@@ -3,6 +3,7 @@ Test cases for LDAP bind authentication functionality.
 """
 
 import pytest
+import pytest_twisted
 from twisted.test import proto_helpers
 from ldaptor.protocols.pureldap import LDAPBindRequest, LDAPBindResponse
 
@@ -108,6 +109,21 @@ class TestBindHandler:
         password = ""
         result = bind_handler.handle_simple_bind(dn, password)
         assert result == (49, "Invalid credentials")
+    
+    @pytest_twisted.inlineCallbacks
+    def test_simple_bind_deferred(self, setup):
+        """Test that the deferred bind path matches the synchronous one."""
+        bind_handler = setup['bind_handler']
+        dn = "uid=admin,ou=people,dc=example,dc=com"
+        
+        result = yield bind_handler.handle_simple_bind_deferred(dn, "admin123")
+        assert result == (0, "Authentication successful")
+        
+        result = yield bind_handler.handle_simple_bind_deferred(dn, "wrongpassword")
+        assert result == (49, "Invalid credentials")
+        
+        result = yield bind_handler.handle_simple_bind_deferred("uid=missing,dc=example,dc=com", "x")
+        assert result == (32, "No such object")
 
 
 class TestCustomLDAPServerBind:
@@ -147,6 +163,7 @@ class TestCustomLDAPServerBind:
             'transport': transport
         }
     
+    @pytest_twisted.inlineCallbacks
     def test_anonymous_bind_request(self, setup):
         """Test handling of anonymous bind request."""
         protocol = setup['protocol']
@@ -160,7 +177,7 @@ class TestCustomLDAPServerBind:
             replies.append(response)
         
         # Handle the bind request
-        protocol.handle_LDAPBindRequest(bind_request, [], mock_reply)
+        yield protocol.handle_LDAPBindRequest(bind_request, [], mock_reply)
         
         # Check response
         assert len(replies) == 1
@@ -168,6 +185,7 @@ class TestCustomLDAPServerBind:
         assert response.resultCode == 0  # Success
         assert protocol.authenticated_dn is None  # Anonymous
     
+    @pytest_twisted.inlineCallbacks
     def test_simple_bind_success(self, setup):
         """Test successful simple bind."""
         protocol = setup['protocol']
@@ -181,7 +199,7 @@ class TestCustomLDAPServerBind:
             replies.append(response)
         
         # Handle the bind request
-        protocol.handle_LDAPBindRequest(bind_request, [], mock_reply)
+        yield protocol.handle_LDAPBindRequest(bind_request, [], mock_reply)
         
         # Check response
         assert len(replies) == 1
@@ -189,6 +207,7 @@ class TestCustomLDAPServerBind:
         assert response.resultCode == 0  # Success
         assert protocol.authenticated_dn == "uid=admin,ou=people,dc=example,dc=com"
     
+    @pytest_twisted.inlineCallbacks
     def test_simple_bind_failure(self, setup):
         """Test failed simple bind with wrong password."""
         protocol = setup['protocol']
@@ -202,7 +221,7 @@ class TestCustomLDAPServerBind:
             replies.append(response)
         
         # Handle the bind request
-        protocol.handle_LDAPBindRequest(bind_request, [], mock_reply)
+        yield protocol.handle_LDAPBindRequest(bind_request, [], mock_reply)
         
         # Check response
         assert len(replies) == 1
@@ -210,6 +229,7 @@ class TestCustomLDAPServerBind:
         assert response.resultCode == 49  # Invalid credentials
         assert protocol.authenticated_dn is None  # Not authenticated
     
+    @pytest_twisted.inlineCallbacks
     def test_connection_lost_clears_auth(self, setup):
         """Test that losing connection clears authentication state."""
         protocol = setup['protocol']
@@ -221,7 +241,7 @@ class TestCustomLDAPServerBind:
         def mock_reply(response):
             replies.append(response)
         
-        protocol.handle_LDAPBindRequest(bind_request, [], mock_reply)
+        yield protocol.handle_LDAPBindRequest(bind_request, [], mock_reply)
         
         # Verify authentication succeeded
         assert protocol.authenticated_dn == "uid=admin,ou=people,dc=example,dc=com"
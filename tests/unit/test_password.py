@@ -3,6 +3,7 @@ Test cases for password authentication functionality.
 """
 
 import pytest
+from unittest.mock import patch
 from ldap_server.auth.password import PasswordManager, generate_secure_password
 
 
@@ -114,6 +115,68 @@ class TestPasswordManager:
         
         # Empty hash
         assert PasswordManager.verify_password(password, "") is False
+    
+    def test_malformed_bcrypt_hash_skips_bcrypt(self):
+        """Test that structurally invalid bcrypt hashes are rejected up front."""
+        import base64
+        truncated = base64.b64encode(b"$2b$12$tooshort").decode('ascii')
+        trailing_newline = base64.b64encode(b"$2b$12$" + b"a" * 53 + b"\n").decode('ascii')
+        
+        with patch("ldap_server.auth.password.bcrypt.checkpw") as checkpw:
+            assert PasswordManager.verify_password("password", f"{{BCRYPT}}{truncated}") is False
+            assert PasswordManager.verify_password("password", f"{{BCRYPT}}{trailing_newline}") is False
+            checkpw.assert_not_called()
+
+
+class TestVerifyCache:
+    """Test cases for the bcrypt verification cache."""
+    
+    @pytest.fixture(autouse=True)
+    def clean_cache(self):
+        """Start and finish each test with an empty cache."""
+        PasswordManager.clear_verify_cache()
+        yield
+        PasswordManager.clear_verify_cache()
+    
+    def test_repeat_verification_skips_bcrypt(self):
+        """Test that a repeated successful verification is served from cache."""
+        hashed = PasswordManager.hash_password("cachedpassword", rounds=4)
+        assert PasswordManager.verify_password("cachedpassword", hashed) is True
+        
+        with patch("ldap_server.auth.password.bcrypt.checkpw") as checkpw:
+            assert PasswordManager.verify_password("cachedpassword", hashed) is True
+            checkpw.assert_not_called()
+    
+    def test_failures_are_not_cached(self):
+        """Test that wrong passwords always reach bcrypt."""
+        hashed = PasswordManager.hash_password("cachedpassword", rounds=4)
+        assert PasswordManager.verify_password("cachedpassword", hashed) is True
+        
+        with patch("ldap_server.auth.password.bcrypt.checkpw", return_value=False) as checkpw:
+            assert PasswordManager.verify_password("wrongpassword", hashed) is False
+            assert PasswordManager.verify_password("wrongpassword", hashed) is False
+            assert checkpw.call_count == 2
+    
+    def test_expired_entries_are_reverified(self):
+        """Test that cached verifications expire after the TTL."""
+        hashed = PasswordManager.hash_password("cachedpassword", rounds=4)
+        
+        with patch.object(PasswordManager, "verify_cache_ttl", -1.0):
+            assert PasswordManager.verify_password("cachedpassword", hashed) is True
+        
+        with patch("ldap_server.auth.password.bcrypt.checkpw", return_value=True) as checkpw:
+            assert PasswordManager.verify_password("cachedpassword", hashed) is True
+            checkpw.assert_called_once()
+    
+    def test_cache_can_be_disabled(self):
+        """Test that disabling the cache always verifies with bcrypt."""
+        hashed = PasswordManager.hash_password("cachedpassword", rounds=4)
+        
+        with patch.object(PasswordManager, "enable_verify_cache", False):
+            assert PasswordManager.verify_password("cachedpassword", hashed) is True
+            with patch("ldap_server.auth.password.bcrypt.checkpw", return_value=True) as checkpw:
+                assert PasswordManager.verify_password("cachedpassword", hashed) is True
+                checkpw.assert_called_once()
 
 
 class TestSecurePasswordGeneration:
@@ -129,6 +192,7 @@ class TestSecurePasswordGeneration:
         # Should contain various character types
         assert any(c.islower() for c in password)  # lowercase
         assert any(c.isupper() for c in password)  # uppercase
+        assert any(c.isdigit() for c in password)  # digit
     
     def test_generate_secure_password_custom_length(self):
         """Test password generation with custom length."""
@@ -177,6 +241,15 @@ class TestPasswordUpgrade:
         # Should verify correctly
         assert PasswordManager.verify_password("plaintext123", password)
     
+    def test_hash_passwords_batch(self):
+        """Test that batch hashing returns verifiable hashes in input order."""
+        passwords = ["first-password", "second-password", "third-password"]
+        hashed = PasswordManager.hash_passwords(passwords, rounds=4)
+        
+        assert len(hashed) == len(passwords)
+        for password, password_hash in zip(passwords, hashed):
+            assert PasswordManager.verify_password(password, password_hash)
+    
     def test_upgrade_preserves_existing_hashes(self):
         """Test that existing hashed passwords are preserved."""
         existing_hash = PasswordManager.hash_password("existing")
@@ -1,71 +1,102 @@
 """
 Unit tests for unified JSON storage backend.
 """
+import copy
 import pytest
-import tempfile
 import json
 import os
+import re
 import time
 import threading
-from pathlib import Path
 from unittest.mock import patch, MagicMock
 
-from src.ldap_server.storage.json import JSONStorage, AtomicJSONWriter
+from src.ldap_server.storage.json import JSONStorage, AtomicJSONWriter, JSONFileWatcher, _merge_entries, _parse_dn, _normalize_dn
+
+
+# Error message patterns shared by pytest.raises(match=...) checks
+_DUPLICATE_DN_RE = re.compile("Duplicate DN")
+_MISSING_ATTRIBUTES_RE = re.compile("missing 'attributes' field")
+
+
+def tree_dns(entry):
+    """Collect the DNs of all entries below an LDIF tree entry."""
+    dns = []
+    
+    def visit(child):
+        dns.append(child.dn.getText())
+        child.children(visit)
+    
+    entry.children(visit)
+    return dns
 
 
 @pytest.fixture
-def temp_json_file():
+def temp_json_file(tmp_path):
     """Create a temporary JSON file for testing."""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        temp_path = Path(f.name)
-        
-    yield temp_path
-    
-    # Cleanup
-    if temp_path.exists():
-        temp_path.unlink()
+    temp_path = tmp_path / "data.json"
+    temp_path.touch()
+    return temp_path
+
+
+SAMPLE_ENTRIES = [
+    {
+        "dn": "dc=example,dc=com",
+        "attributes": {
+            "dc": ["example"],
+            "objectClass": ["top", "domain"]
+        }
+    },
+    {
+        "dn": "ou=users,dc=example,dc=com",
+        "attributes": {
+            "ou": ["users"],
+            "objectClass": ["top", "organizationalUnit"]
+        }
+    },
+    {
+        "dn": "uid=john,ou=users,dc=example,dc=com",
+        "attributes": {
+            "uid": ["john"],
+            "cn": ["John Doe"],
+            "sn": ["Doe"],
+            "objectClass": ["top", "person", "organizationalPerson", "inetOrgPerson"]
+        }
+    }
+]
 
 
 @pytest.fixture
 def sample_entries():
     """Sample LDAP entries for testing."""
-    return [
-        {
-            "dn": "dc=example,dc=com",
-            "attributes": {
-                "dc": ["example"],
-                "objectClass": ["top", "domain"]
-            }
-        },
-        {
-            "dn": "ou=users,dc=example,dc=com",
-            "attributes": {
-                "ou": ["users"],
-                "objectClass": ["top", "organizationalUnit"]
-            }
-        },
-        {
-            "dn": "uid=john,ou=users,dc=example,dc=com",
-            "attributes": {
-                "uid": ["john"],
-                "cn": ["John Doe"],
-                "sn": ["Doe"],
-                "objectClass": ["top", "person", "organizationalPerson", "inetOrgPerson"]
-            }
-        }
-    ]
+    return copy.deepcopy(SAMPLE_ENTRIES)
+
+
+@pytest.fixture(scope="session")
+def readonly_storage(tmp_path_factory):
+    """Read-only storage shared by tests that never modify it."""
+    json_path = tmp_path_factory.mktemp("readonly") / "data.json"
+    json_path.write_text(json.dumps(SAMPLE_ENTRIES))
+    
+    storage = JSONStorage(
+        json_file_paths=json_path,
+        read_only=True,
+        enable_file_watching=False
+    )
+    
+    yield storage
+    
+    storage.cleanup()
 
 
 @pytest.fixture
-def temp_json_files(sample_entries):
+def temp_json_files(tmp_path, sample_entries):
     """Create multiple temporary JSON files for federation testing."""
-    users_file = tempfile.NamedTemporaryFile(mode='w', suffix='_users.json', delete=False)
-    groups_file = tempfile.NamedTemporaryFile(mode='w', suffix='_groups.json', delete=False)
+    users_file = tmp_path / "users.json"
+    groups_file = tmp_path / "groups.json"
     
     # Write user entries
     user_entries = [entry for entry in sample_entries if 'uid=' in entry['dn'] or 'ou=users' in entry['dn']]
-    json.dump(user_entries, users_file, indent=2)
-    users_file.close()
+    users_file.write_text(json.dumps(user_entries))
     
     # Write group entries
     group_entries = [
@@ -85,17 +116,9 @@ def temp_json_files(sample_entries):
             }
         }
     ]
-    json.dump(group_entries, groups_file, indent=2)
-    groups_file.close()
-    
-    files = [Path(users_file.name), Path(groups_file.name)]
+    groups_file.write_text(json.dumps(group_entries))
     
-    yield files
-    
-    # Cleanup
-    for file_path in files:
-        if file_path.exists():
-            file_path.unlink()
+    return [users_file, groups_file]
 
 
 class TestUnifiedJSONStorage:
@@ -105,7 +128,7 @@ class TestUnifiedJSONStorage:
         """Test single file mode (legacy compatibility)."""
         # Write sample data
         with open(temp_json_file, 'w') as f:
-            json.dump(sample_entries, f, indent=2)
+            json.dump(sample_entries, f)
         
         # Initialize storage in single file mode
         storage = JSONStorage(
@@ -131,7 +154,7 @@ class TestUnifiedJSONStorage:
     def test_multi_file_mode(self, temp_json_files):
         """Test multi-file federation mode."""
         storage = JSONStorage(
-            json_file_paths=[str(f) for f in temp_json_files],
+            json_file_paths=temp_json_files,
             merge_strategy="last_wins",
             enable_file_watching=False
         )
@@ -149,62 +172,53 @@ class TestUnifiedJSONStorage:
         finally:
             storage.cleanup()
     
-    def test_read_only_mode(self, temp_json_file, sample_entries):
+    def test_read_only_mode(self, readonly_storage):
         """Test read-only mode functionality."""
-        # Write sample data
-        with open(temp_json_file, 'w') as f:
-            json.dump(sample_entries, f, indent=2)
+        storage = readonly_storage
         
-        # Initialize in read-only mode
-        storage = JSONStorage(
-            json_file_paths=str(temp_json_file),
-            read_only=True,
-            enable_file_watching=False
+        # Verify read operations work
+        root = storage.get_root()
+        assert root is not None
+        
+        stats = storage.get_stats()
+        assert stats['read_only'] is True
+        
+        # Verify write operations are disabled
+        result = storage.add_entry(
+            "uid=test,ou=users,dc=example,dc=com",
+            {"uid": ["test"], "cn": ["Test User"]}
         )
+        assert result is False
         
-        try:
-            # Verify read operations work
-            root = storage.get_root()
-            assert root is not None
-            
-            stats = storage.get_stats()
-            assert stats['read_only'] is True
-            
-            # Verify write operations are disabled
-            result = storage.add_entry(
-                "uid=test,ou=users,dc=example,dc=com",
-                {"uid": ["test"], "cn": ["Test User"]}
-            )
-            assert result is False
-            
-            result = storage.modify_entry(
-                "uid=john,ou=users,dc=example,dc=com",
-                {"cn": ["Modified Name"]}
-            )
-            assert result is False
-            
-            result = storage.delete_entry("uid=john,ou=users,dc=example,dc=com")
-            assert result is False
-            
-            result = storage.bulk_write_entries([
-                {"dn": "uid=bulk,ou=users,dc=example,dc=com", "attributes": {"uid": ["bulk"]}}
-            ])
-            assert result is False
-            
-        finally:
-            storage.cleanup()
+        result = storage.modify_entry(
+            "uid=john,ou=users,dc=example,dc=com",
+            {"cn": ["Modified Name"]}
+        )
+        assert result is False
+        
+        result = storage.delete_entry("uid=john,ou=users,dc=example,dc=com")
+        assert result is False
+        
+        result = storage.bulk_write_entries([
+            {"dn": "uid=bulk,ou=users,dc=example,dc=com", "attributes": {"uid": ["bulk"]}}
+        ])
+        assert result is False
+        
+        # Rejected writes must leave the shared storage untouched
+        assert storage.get_stats()['total_entries'] == len(SAMPLE_ENTRIES)
     
     def test_write_operations_enabled(self, temp_json_file, sample_entries):
         """Test write operations when not in read-only mode."""
         # Write sample data
         with open(temp_json_file, 'w') as f:
-            json.dump(sample_entries, f, indent=2)
+            json.dump(sample_entries, f)
         
         storage = JSONStorage(
             json_file_paths=str(temp_json_file),
             read_only=False,
             enable_file_watching=False,
-            enable_backups=False  # Disable for testing
+            enable_backups=False,  # Disable for testing
+            fsync_writes=False
         )
         
         try:
@@ -251,6 +265,212 @@ class TestUnifiedJSONStorage:
         finally:
             storage.cleanup()
     
+    def test_writes_do_not_reread_files(self, temp_json_file, sample_entries):
+        """Test that a write reuses the written entries instead of re-parsing the file."""
+        temp_json_file.write_text(json.dumps(sample_entries))
+        storage = JSONStorage(
+            json_file_paths=temp_json_file,
+            enable_file_watching=False,
+            enable_backups=False,
+            fsync_writes=False
+        )
+        
+        try:
+            attributes = {"uid": ["jane"], "objectClass": ["top", "person"]}
+            with patch.object(storage, '_load_json_file', wraps=storage._load_json_file) as mock_load:
+                assert storage.add_entry("uid=jane,ou=users,dc=example,dc=com", attributes) is True
+            mock_load.assert_not_called()
+            
+            # Later changes to the caller's dict must not leak into storage
+            attributes["uid"].append("janet")
+            entries = storage._entries_by_file[str(temp_json_file)]
+            jane = next(e for e in entries if e["dn"] == "uid=jane,ou=users,dc=example,dc=com")
+            assert jane["attributes"]["uid"] == ["jane"]
+            
+            assert storage.add_entry("uid=bad,ou=users,dc=example,dc=com", {"uid": "bad"}) is False
+            assert "uid=bad" not in temp_json_file.read_text()
+        finally:
+            storage.cleanup()
+    
+    def test_writes_are_not_lost_during_reloads(self, temp_json_file, sample_entries):
+        """Test that reloads on another thread cannot drop concurrent writes."""
+        temp_json_file.write_text(json.dumps(sample_entries))
+        storage = JSONStorage(
+            json_file_paths=temp_json_file,
+            enable_file_watching=False,
+            enable_backups=False,
+            fsync_writes=False
+        )
+        stop = threading.Event()
+        
+        def reload_loop():
+            while not stop.is_set():
+                storage._parse_cache.clear()  # Re-parse and rebuild each time
+                storage._load_all_files()
+        
+        reloader = threading.Thread(target=reload_loop)
+        reloader.start()
+        try:
+            for i in range(20):
+                assert storage.add_entry(f"uid=user{i},ou=users,dc=example,dc=com", {"uid": [f"user{i}"]})
+        finally:
+            stop.set()
+            reloader.join(timeout=30.0)
+        
+        try:
+            assert len(json.loads(temp_json_file.read_text())) == 23
+            assert storage.get_stats()['total_entries'] == 23
+        finally:
+            storage.cleanup()
+    
+    def test_tree_reflects_writes(self, temp_json_file, sample_entries):
+        """Test that the LDAP tree is rebuilt after write operations."""
+        temp_json_file.write_text(json.dumps(sample_entries))
+        
+        storage = JSONStorage(
+            json_file_paths=str(temp_json_file),
+            enable_file_watching=False,
+            enable_backups=False
+        )
+        
+        try:
+            root = storage.get_root()
+            assert "uid=john,ou=users,dc=example,dc=com" in tree_dns(root)
+            
+            assert storage.add_entry("uid=alice,ou=users,dc=example,dc=com", {"uid": ["alice"]})
+            assert storage.delete_entry("uid=john,ou=users,dc=example,dc=com")
+            
+            # The original root handle sees the rebuilt tree
+            dns = tree_dns(root)
+            assert "uid=alice,ou=users,dc=example,dc=com" in dns
+            assert "uid=john,ou=users,dc=example,dc=com" not in dns
+        finally:
+            storage.cleanup()
+    
+    def test_tree_rebuild_is_atomic(self, temp_json_file, sample_entries):
+        """Test that rebuilds swap in a complete tree and keep the old one on failure."""
+        temp_json_file.write_text(json.dumps(sample_entries))
+        storage = JSONStorage(json_file_paths=temp_json_file, enable_file_watching=False)
+        
+        try:
+            root = storage.get_root()
+            with patch.object(storage, '_fill_tree_dir', side_effect=OSError("disk full")):
+                with pytest.raises(OSError):
+                    storage._build_ldap_tree([])
+            assert "uid=john,ou=users,dc=example,dc=com" in tree_dns(root)
+            
+            storage._build_ldap_tree(sample_entries[:1])
+            assert tree_dns(root) == ["dc=com", "dc=example,dc=com"]
+            
+            # Only the current build directory is left next to the symlink
+            builds = [name for name in os.listdir(storage._temp_dir) if name != "tree"]
+            assert len(builds) == 1
+            assert os.readlink(storage._tree_path) == builds[0]
+        finally:
+            storage.cleanup()
+    
+    def test_lazy_tree_building(self, temp_json_file, sample_entries):
+        """Test that lazy loading defers tree construction until get_root()."""
+        temp_json_file.write_text(json.dumps(sample_entries))
+        
+        storage = JSONStorage(
+            json_file_paths=str(temp_json_file),
+            enable_file_watching=False,
+            enable_lazy_loading=True
+        )
+        
+        try:
+            # Stats are available without building the tree
+            assert storage.get_stats()['total_entries'] == 3
+            assert os.listdir(storage._temp_dir) == []
+            
+            root = storage.get_root()
+            assert "uid=john,ou=users,dc=example,dc=com" in tree_dns(root)
+            assert storage.get_root() is root
+        finally:
+            storage.cleanup()
+    
+    def test_ndjson_file_mode(self, tmp_path, sample_entries):
+        """Test loading and writing newline-delimited JSON files."""
+        ndjson_file = tmp_path / "data.ndjson"
+        original = "\n".join(json.dumps(entry) for entry in sample_entries) + "\n\n"
+        ndjson_file.write_text(original)
+        
+        storage = JSONStorage(
+            json_file_paths=ndjson_file,
+            enable_file_watching=False,
+            enable_backups=False
+        )
+        
+        try:
+            assert storage.get_stats()['total_entries'] == 3
+            
+            assert storage.add_entry("uid=alice,ou=users,dc=example,dc=com", {"uid": ["alice"]})
+            
+            # The new entry is appended as one line; existing content is untouched
+            content = ndjson_file.read_text()
+            assert content.startswith(original)
+            lines = [line for line in content.splitlines() if line.strip()]
+            assert len(lines) == 4
+            assert json.loads(lines[-1])["dn"] == "uid=alice,ou=users,dc=example,dc=com"
+        finally:
+            storage.cleanup()
+    
+    def test_ndjson_torn_append(self, tmp_path, sample_entries):
+        """Test that a torn append is skipped and dropped on the next write."""
+        ndjson_file = tmp_path / "data.ndjson"
+        lines = [json.dumps(entry) for entry in sample_entries]
+        ndjson_file.write_text("\n".join(lines) + "\n")
+        
+        storage = JSONStorage(
+            json_file_paths=ndjson_file,
+            enable_file_watching=False,
+            enable_backups=False
+        )
+        
+        try:
+            # An append interrupted part way through the line
+            with open(ndjson_file, 'a') as f:
+                f.write('{"dn": "uid=torn')
+            storage._load_all_files()
+            assert storage.get_stats()['total_entries'] == 3
+            
+            assert storage.add_entry("uid=alice,ou=users,dc=example,dc=com", {"uid": ["alice"]})
+            
+            content = ndjson_file.read_text()
+            assert "uid=torn" not in content
+            assert json.loads(content.splitlines()[-1])["dn"] == "uid=alice,ou=users,dc=example,dc=com"
+            
+            storage._parse_cache.clear()
+            storage._load_all_files()
+            assert storage.get_stats()['total_entries'] == 4
+        finally:
+            storage.cleanup()
+    
+    def test_ndjson_bad_last_line_is_an_error(self, tmp_path, sample_entries):
+        """Test that an unparsable last line the storage did not append fails loudly."""
+        ndjson_file = tmp_path / "users.ndjson"
+        other_file = tmp_path / "groups.ndjson"
+        lines = [json.dumps(entry) for entry in sample_entries]
+        ndjson_file.write_text("\n".join(lines) + '\n{"dn": "uid=typo",')
+        other_file.write_text(lines[0] + "\n")
+        
+        with pytest.raises(ValueError):
+            JSONStorage(json_file_paths=ndjson_file, enable_file_watching=False)
+        
+        storage = JSONStorage(
+            json_file_paths=[ndjson_file, other_file],
+            enable_file_watching=False,
+            enable_backups=False
+        )
+        try:
+            before = ndjson_file.read_text()
+            assert storage.add_entry("uid=alice,ou=users,dc=example,dc=com", {"uid": ["alice"]},
+                                     target_file=str(ndjson_file)) is False
+            assert ndjson_file.read_text() == before
+        finally:
+            storage.cleanup()
+    
     def test_merge_strategies(self, temp_json_files):
         """Test different merge strategies for conflicting DNs."""
         # Create conflicting entries
@@ -288,7 +508,7 @@ class TestUnifiedJSONStorage:
         
         # Test last_wins strategy
         storage = JSONStorage(
-            json_file_paths=[str(file1), str(file2)],
+            json_file_paths=[file1, file2],
             merge_strategy="last_wins",
             enable_file_watching=False
         )
@@ -300,12 +520,13 @@ class TestUnifiedJSONStorage:
             # Check that we have the expected entries via stats
             stats = storage.get_stats()
             assert stats['total_entries'] == 1  # Only one entry after merge
+            assert stats['merge_conflicts'] == 1
         finally:
             storage.cleanup()
         
         # Test first_wins strategy
         storage = JSONStorage(
-            json_file_paths=[str(file1), str(file2)],
+            json_file_paths=[file1, file2],
             merge_strategy="first_wins",
             enable_file_watching=False
         )
@@ -321,9 +542,9 @@ class TestUnifiedJSONStorage:
             storage.cleanup()
         
         # Test error strategy
-        with pytest.raises(ValueError, match="Duplicate DN"):
+        with pytest.raises(ValueError, match=_DUPLICATE_DN_RE):
             storage = JSONStorage(
-                json_file_paths=[str(file1), str(file2)],
+                json_file_paths=[file1, file2],
                 merge_strategy="error",
                 enable_file_watching=False
             )
@@ -375,6 +596,54 @@ class TestUnifiedJSONStorage:
         finally:
             storage.cleanup()
     
+    def test_password_upgrade_copies_only_changed_entries(self, readonly_storage):
+        """Test that upgrades leave unchanged entries and the input list alone."""
+        hashed_entry = {"dn": "uid=a,dc=example,dc=com", "attributes": {"userPassword": ["{SSHA}abc"]}}
+        plain_entry = {"dn": "uid=b,dc=example,dc=com", "attributes": {"userPassword": ["secret"]}}
+        entries = [hashed_entry, plain_entry]
+        
+        with patch('src.ldap_server.storage.json.PasswordManager.hash_passwords',
+                   return_value=["{BCRYPT}hashed"]) as mock_hash:
+            upgraded = readonly_storage._upgrade_passwords(entries)
+        
+        mock_hash.assert_called_once_with(["secret"])
+        assert upgraded[0] is hashed_entry
+        assert upgraded[1]["attributes"]["userPassword"] == ["{BCRYPT}hashed"]
+        assert plain_entry["attributes"]["userPassword"] == ["secret"]
+        assert readonly_storage._upgrade_passwords([hashed_entry]) == [hashed_entry]
+    
+    def test_validation_does_not_modify_entries(self, readonly_storage):
+        """Test that validating entries leaves the (possibly cached) dicts untouched."""
+        object_classes = ["top", "person"]
+        entries = [{"dn": "uid=x,dc=example,dc=com", "attributes": {"objectClass": object_classes}}]
+        
+        readonly_storage._validate_entries(entries)
+        assert entries[0]["attributes"]["objectClass"] is object_classes
+    
+    def test_page_cache_dropped_only_for_large_files(self, temp_json_file, sample_entries):
+        """Test that only files above the size threshold drop their page cache."""
+        temp_json_file.write_text(json.dumps(sample_entries))
+        
+        with patch("src.ldap_server.storage.json._drop_page_cache") as mock_drop:
+            JSONStorage(json_file_paths=temp_json_file, enable_file_watching=False).cleanup()
+            mock_drop.assert_not_called()
+            
+            with patch("src.ldap_server.storage.json.PAGE_CACHE_DROP_MIN_BYTES", 1):
+                JSONStorage(json_file_paths=temp_json_file, enable_file_watching=False).cleanup()
+            mock_drop.assert_called_once()
+    
+    def test_unparsable_dn_does_not_block_file(self, temp_json_file, sample_entries):
+        """Test that an entry with an unparsable DN does not stop the rest loading."""
+        entries = sample_entries + [{"dn": "cn=bad\\", "attributes": {"cn": ["bad"]}}]
+        temp_json_file.write_text(json.dumps(entries))
+        
+        storage = JSONStorage(json_file_paths=temp_json_file, enable_file_watching=False)
+        try:
+            assert storage.get_stats()['total_entries'] == 4
+            assert "uid=john,ou=users,dc=example,dc=com" in tree_dns(storage.get_root())
+        finally:
+            storage.cleanup()
+    
     def test_invalid_json_format(self, temp_json_file):
         """Test handling of invalid JSON format."""
         # Write invalid JSON
@@ -400,15 +669,110 @@ class TestUnifiedJSONStorage:
         with open(temp_json_file, 'w') as f:
             json.dump(invalid_entries, f)
         
-        with pytest.raises(ValueError, match="missing 'attributes' field"):
+        with pytest.raises(ValueError, match=_MISSING_ATTRIBUTES_RE):
             storage = JSONStorage(
                 json_file_paths=str(temp_json_file),
                 enable_file_watching=False
             )
     
-    def test_nonexistent_file_handling(self):
+    def test_reload_reuses_unchanged_files(self, temp_json_files):
+        """Test that a reload only re-parses files that changed on disk."""
+        users_file, groups_file = temp_json_files
+        storage = JSONStorage(
+            json_file_paths=[users_file, groups_file],
+            enable_file_watching=False
+        )
+        
+        try:
+            groups = json.loads(groups_file.read_text())
+            groups.append({
+                "dn": "cn=staff,ou=groups,dc=example,dc=com",
+                "attributes": {"cn": ["staff"], "objectClass": ["top", "groupOfNames"]}
+            })
+            groups_file.write_text(json.dumps(groups))
+            
+            with patch.object(storage, '_load_json_file', wraps=storage._load_json_file) as mock_load:
+                storage._load_all_files()
+            
+            mock_load.assert_called_once_with(groups_file)
+            assert storage.get_stats()['total_entries'] == 5
+        finally:
+            storage.cleanup()
+    
+    def test_unchanged_files_are_not_reindexed(self, temp_json_files):
+        """Test that reloads and writes only normalize DNs of changed entries."""
+        users_file, groups_file = temp_json_files
+        storage = JSONStorage(
+            json_file_paths=[users_file, groups_file],
+            enable_file_watching=False,
+            enable_backups=False,
+            fsync_writes=False
+        )
+        
+        try:
+            groups = json.loads(groups_file.read_text())
+            groups.append({
+                "dn": "cn=staff,ou=groups,dc=example,dc=com",
+                "attributes": {"cn": ["staff"], "objectClass": ["top", "groupOfNames"]}
+            })
+            groups_file.write_text(json.dumps(groups))
+            
+            with patch('src.ldap_server.storage.json._normalize_dn', wraps=_normalize_dn) as mock_normalize:
+                storage._load_all_files()
+                assert mock_normalize.call_count == len(groups)
+                
+                mock_normalize.reset_mock()
+                assert storage.add_entry("uid=jane,ou=users,dc=example,dc=com", {"uid": ["jane"]},
+                                         target_file=str(users_file))
+                assert mock_normalize.call_count == 1
+            
+            assert storage._locate_entry("UID=Jane, OU=Users, DC=Example, DC=Com") is not None
+        finally:
+            storage.cleanup()
+    
+    def test_reload_without_changes_keeps_tree(self, temp_json_files):
+        """Test that a reload with no file changes does not rebuild the tree."""
+        users_file, groups_file = temp_json_files
+        storage = JSONStorage(
+            json_file_paths=[users_file, groups_file],
+            enable_file_watching=False
+        )
+        
+        try:
+            root = storage.get_root()
+            with patch.object(storage, '_build_ldap_tree') as mock_build, \
+                    patch.object(storage, '_upgrade_passwords') as mock_upgrade, \
+                    patch.object(storage, '_dn_keys_for') as mock_index:
+                storage._load_all_files()
+            
+            mock_build.assert_not_called()
+            mock_upgrade.assert_not_called()
+            mock_index.assert_not_called()
+            assert storage.get_root() is root
+            assert storage.get_stats()['total_entries'] == 4
+        finally:
+            storage.cleanup()
+    
+    def test_invalid_file_in_federation(self, temp_json_files):
+        """Test that one unparsable file does not block the other files."""
+        users_file, groups_file = temp_json_files
+        groups_file.write_text("invalid json content")
+        
+        storage = JSONStorage(
+            json_file_paths=[users_file, groups_file],
+            enable_file_watching=False
+        )
+        
+        try:
+            stats = storage.get_stats()
+            assert stats['total_entries'] == 2
+            assert str(groups_file) not in storage._entries_by_file
+        finally:
+            storage.cleanup()
+    
+    def test_nonexistent_file_handling(self, tmp_path):
         """Test handling of non-existent files."""
-        nonexistent_file = "/tmp/nonexistent_file_12345.json"
+        nonexistent_file = str(tmp_path / "nonexistent_file.json")
         
         # Should not raise error, but log warning
         storage = JSONStorage(
@@ -439,16 +803,21 @@ class TestUnifiedJSONStorage:
         
         temp_dir = storage._temp_dir
         assert os.path.exists(temp_dir)
+        other = JSONStorage(json_file_paths=str(temp_json_file), enable_file_watching=False)
         
         storage.cleanup()
         
         # Temp directory should be cleaned up
         assert not os.path.exists(temp_dir)
+        
+        # The DN parse cache is shared with other instances and survives
+        assert _parse_dn.cache_info().currsize > 0
+        other.cleanup()
     
     def test_stats_comprehensive(self, temp_json_files):
         """Test comprehensive statistics reporting."""
         storage = JSONStorage(
-            json_file_paths=[str(f) for f in temp_json_files],
+            json_file_paths=temp_json_files,
             merge_strategy="last_wins",
             read_only=True,
             enable_file_watching=True,
@@ -480,6 +849,62 @@ class TestUnifiedJSONStorage:
             storage.cleanup()
 
 
+class TestMergeEntries:
+    """Test merge strategies on in-memory entry lists."""
+    
+    @pytest.fixture
+    def merge_inputs(self):
+        """Two files sharing one conflicting DN."""
+        sample_data_1 = [
+            {"dn": "dc=example,dc=com", "attributes": {"o": ["First"]}},
+            {"dn": "ou=users,dc=example,dc=com", "attributes": {"ou": ["users"]}}
+        ]
+        sample_data_2 = [
+            {"dn": "ou=groups,dc=example,dc=com", "attributes": {"ou": ["groups"]}}
+        ]
+        conflicting_data = [
+            {"dn": "dc=example,dc=com", "attributes": {"o": ["Second"]}}
+        ]
+        return [sample_data_1, sample_data_2, conflicting_data]
+    
+    def test_merge_last_wins(self, merge_inputs):
+        """Test that the last occurrence of a DN wins."""
+        merged, conflicts = _merge_entries(merge_inputs, "last_wins")
+        
+        assert conflicts == 1
+        assert len(merged) == 3
+        assert merged["dc=example,dc=com"]["attributes"]["o"] == ["Second"]
+    
+    def test_merge_first_wins(self, merge_inputs):
+        """Test that the first occurrence of a DN wins."""
+        merged, conflicts = _merge_entries(merge_inputs, "first_wins")
+        
+        assert conflicts == 1
+        assert len(merged) == 3
+        assert merged["dc=example,dc=com"]["attributes"]["o"] == ["First"]
+    
+    def test_merge_error(self, merge_inputs):
+        """Test that conflicting DNs raise with the error strategy."""
+        with pytest.raises(ValueError, match=_DUPLICATE_DN_RE):
+            _merge_entries(merge_inputs, "error")
+    
+    def test_merge_without_conflicts(self, merge_inputs):
+        """Test that disjoint files merge without conflicts under any strategy."""
+        merged, conflicts = _merge_entries(merge_inputs[:2], "error")
+        
+        assert conflicts == 0
+        assert list(merged) == [
+            "dc=example,dc=com",
+            "ou=users,dc=example,dc=com",
+            "ou=groups,dc=example,dc=com"
+        ]
+    
+    def test_unknown_strategy(self, merge_inputs):
+        """Test that an unknown strategy is rejected on conflict."""
+        with pytest.raises(ValueError, match="Unknown merge strategy"):
+            _merge_entries(merge_inputs, "bogus")
+
+
 class TestAtomicJSONWriter:
     """Test atomic JSON writer functionality."""
     
@@ -569,6 +994,83 @@ class TestAtomicJSONWriter:
         assert success_count >= 1
 
 
+class TestJSONFileWatcher:
+    """Test file watcher event dispatch."""
+    
+    def test_reloads_only_watched_files(self, temp_json_file, sample_entries):
+        """Test that only events for watched files trigger a reload."""
+        temp_json_file.write_text(json.dumps(sample_entries))
+        storage = JSONStorage(json_file_paths=temp_json_file, enable_file_watching=False, debounce_time=0.2)
+        
+        try:
+            watcher = JSONFileWatcher(storage)
+            
+            with patch.object(storage, '_load_all_files') as mock_reload:
+                other_file = temp_json_file.parent / "other.json"
+                watcher.on_modified(MagicMock(is_directory=False, src_path=str(other_file)))
+                assert watcher._timer is None
+                
+                temp_json_file.write_text(json.dumps(sample_entries[:1]))
+                watcher.on_modified(MagicMock(is_directory=False, src_path=str(temp_json_file)))
+                watcher._timer.join(timeout=5.0)
+                mock_reload.assert_called_once()
+        finally:
+            storage.cleanup()
+    
+    def test_event_bursts_reload_once(self, temp_json_file, sample_entries):
+        """Test that a burst of events, including atomic renames, reloads once."""
+        temp_json_file.write_text(json.dumps(sample_entries))
+        storage = JSONStorage(json_file_paths=temp_json_file, enable_file_watching=False, debounce_time=0.2)
+        
+        try:
+            watcher = JSONFileWatcher(storage)
+            temp_name = str(temp_json_file.parent / f".{temp_json_file.name}.abc.tmp")
+            
+            with patch.object(storage, '_load_all_files') as mock_reload:
+                temp_json_file.write_text(json.dumps(sample_entries[:1]))
+                watcher.on_modified(MagicMock(is_directory=False, src_path=str(temp_json_file)))
+                watcher.on_modified(MagicMock(is_directory=False, src_path=temp_name))
+                watcher.on_moved(MagicMock(is_directory=False, src_path=temp_name,
+                                           dest_path=str(temp_json_file)))
+                mock_reload.assert_not_called()
+                
+                watcher._timer.join(timeout=5.0)
+                mock_reload.assert_called_once()
+        finally:
+            storage.cleanup()
+    
+    def test_own_writes_do_not_reload(self, temp_json_file, sample_entries):
+        """Test that events caused by the storage's own writes skip the reload."""
+        temp_json_file.write_text(json.dumps(sample_entries))
+        storage = JSONStorage(json_file_paths=temp_json_file, enable_file_watching=False,
+                              debounce_time=0.2, enable_backups=False, fsync_writes=False)
+        
+        try:
+            watcher = JSONFileWatcher(storage)
+            assert storage.add_entry("uid=jane,ou=users,dc=example,dc=com", {"uid": ["jane"]})
+            
+            with patch.object(storage, '_load_all_files') as mock_reload:
+                watcher.on_moved(MagicMock(is_directory=False, src_path=str(temp_json_file) + ".x.tmp",
+                                           dest_path=str(temp_json_file)))
+                watcher._timer.join(timeout=5.0)
+                mock_reload.assert_not_called()
+        finally:
+            storage.cleanup()
+    
+    def test_reload_after_cleanup_is_skipped(self, temp_json_file, sample_entries):
+        """Test that a reload firing after cleanup does not touch the storage."""
+        temp_json_file.write_text(json.dumps(sample_entries))
+        storage = JSONStorage(json_file_paths=temp_json_file, enable_file_watching=False, debounce_time=0.2)
+        watcher = JSONFileWatcher(storage)
+        temp_json_file.write_text(json.dumps(sample_entries[:1]))
+        
+        storage.cleanup()
+        with patch.object(storage, '_load_all_files') as mock_reload:
+            watcher._reload(temp_json_file)
+        mock_reload.assert_not_called()
+        assert not os.path.exists(storage._temp_dir)
+
+
 class TestReadOnlyModeUseCases:
     """Test read-only mode use cases for external config management."""
     
@@ -594,7 +1096,7 @@ class TestReadOnlyModeUseCases:
         ]
         
         with open(temp_json_file, 'w') as f:
-            json.dump(external_config, f, indent=2)
+            json.dump(external_config, f)
         
         # LDAP server consumes in read-only mode
         storage = JSONStorage(
@@ -619,7 +1121,7 @@ class TestReadOnlyModeUseCases:
             # Simulate external update
             external_config[0]["attributes"]["o"] = ["Updated Company Inc"]
             with open(temp_json_file, 'w') as f:
-                json.dump(external_config, f, indent=2)
+                json.dump(external_config, f)
             
             # Give file watcher time to detect change
             time.sleep(1.0)
@@ -633,10 +1135,11 @@ class TestReadOnlyModeUseCases:
     def test_multi_file_external_management(self, temp_json_files):
         """Test multi-file external configuration management."""
         storage = JSONStorage(
-            json_file_paths=[str(f) for f in temp_json_files],
+            json_file_paths=temp_json_files,
             read_only=True,
             merge_strategy="last_wins",
-            enable_file_watching=True
+            enable_file_watching=True,
+            enable_lazy_loading=True  # Only stats are checked; skip the tree build
         )
         
         try: